@@ -0,0 +1,90 @@
+"""
+MallocLabs Count-Min Sketch
+
+A fixed-size frequency summary over packed k-mers, used by KmerStore's
+approximate mode.
+"""
+
+import math
+import random
+from array import array
+
+from structures.hashing import PRIME
+
+
+class CountMinSketch:
+    """
+    A depth x width table of counters. Each row hashes a key to one
+    counter; the estimate of a key is the smallest of its counters.
+    Updates are conservative: only counters below the new estimate are
+    raised, which keeps every estimate an upper bound on the true count
+    while overestimating less than a plain Count-Min sketch.
+
+    With width w and depth d, an estimate exceeds the true count by more
+    than (e / w) * total with probability at most e^-d.
+    Memory is 8 * w * d bytes, whatever the number of distinct keys.
+    """
+
+    def __init__(self, width: int, depth: int, seed: int = 0) -> None:
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+
+        rng = random.Random(seed)
+        self._width: int = width
+        self._depth: int = depth
+        self._total: int = 0
+        self._hashes: list[tuple[int, int]] = [
+            (rng.randrange(1, PRIME), rng.randrange(PRIME)) for _ in range(depth)
+        ]
+        self._rows: list[array] = [array("q", bytes(8 * width)) for _ in range(depth)]
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, seed: int = 0) -> "CountMinSketch":
+        """
+        Size a sketch so that an estimate exceeds the true count by more
+        than @epsilon@ * total with probability at most @delta@.
+        """
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), seed)
+
+    def _slots(self, key: int) -> list[int]:
+        return [(a * key + b) % PRIME % self._width for a, b in self._hashes]
+
+    def add(self, key: int, count: int = 1) -> None:
+        """
+        Record @count@ more occurrences of a key, conservatively.
+        Time complexity: O(d)
+        """
+        slots = self._slots(key)
+        target = min(row[slot] for row, slot in zip(self._rows, slots)) + count
+
+        for row, slot in zip(self._rows, slots):
+            if row[slot] < target:
+                row[slot] = target
+
+        self._total += count
+
+    def estimate(self, key: int) -> int:
+        """
+        Return an upper bound on the number of occurrences of a key.
+        Time complexity: O(d)
+        """
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+    def error_bound(self) -> float:
+        """
+        Return the additive error (e / w) * total that an estimate stays
+        within with probability at least 1 - e^-d.
+        """
+        return math.e / self._width * self._total
+
+    def get_total(self) -> int:
+        """
+        Return the number of occurrences added so far.
+        """
+        return self._total
+
+    def get_width(self) -> int:
+        return self._width
+
+    def get_depth(self) -> int:
+        return self._depth
@@ -5,12 +5,123 @@ Joel Mackenzie and Vladimir Morozov
 """
 
 import argparse
+import math
 import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO
 
+# Every byte value maps to the base given by its low two bits
+BASES = bytes(b"ACGT"[i & 3] for i in range(256))
+# And each base back to its code
+CODES = {base: code for code, base in enumerate(b"ACGT")}
 
-def DNA(length: int) -> str:
-    return "".join(random.choice("ACGT") for _ in range(length))
+# Sequences generated per shard; each shard has its own derived seed
+SHARD_SIZE = 4096
+
+
+def DNA(length: int, rng: random.Random | None = None) -> str:
+    """
+    Return a uniformly random sequence of @length@ bases, drawn from
+    @rng@ (or the module's generator) a block of random bytes at a time.
+    """
+    randbytes = rng.randbytes if rng else random.randbytes
+    return randbytes(length).translate(BASES).decode("ascii")
+
+
+class Workload:
+    """
+    The shape of the generated sequences.
+    A @repeat@ fraction of the bases are copied from a library of
+    @elements@ repeat elements of @element_length@ bases, chosen with
+    Zipf-skewed probability 1 / rank^@skew@ (0 is uniform), so some
+    k-mers are far more frequent than others. Each output base is then
+    substituted by a random base with probability @error@.
+    """
+
+    def __init__(self, repeat: float = 0.0, skew: float = 0.0, error: float = 0.0,
+                 elements: int = 1000, element_length: int = 300, seed: int = 0) -> None:
+        if not 0 <= repeat <= 1:
+            raise ValueError("repeat must be between 0 and 1")
+        if not 0 <= error <= 1:
+            raise ValueError("error must be between 0 and 1")
+
+        rng = random.Random(f"{seed}:library")
+        self.repeat = repeat
+        self.error = error
+        self.library = [DNA(element_length, rng).encode("ascii") for _ in range(elements)]
+        self.weights = [1 / rank ** skew for rank in range(1, elements + 1)]
+
+    def sequence(self, length: int, rng: random.Random) -> bytes:
+        """
+        Return one sequence of @length@ bases.
+        """
+        if self.repeat <= 0:
+            chunk = rng.randbytes(length).translate(BASES)
+        else:
+            parts = []
+            size = 0
+            while size < length:
+                if rng.random() < self.repeat:
+                    part = rng.choices(self.library, self.weights)[0]
+                else:
+                    part = rng.randbytes(len(self.library[0])).translate(BASES)
+                parts.append(part)
+                size += len(part)
+            chunk = b"".join(parts)[:length]
+
+        if self.error > 0:
+            chunk = self.mutate(chunk, rng)
+
+        return chunk
+
+    def mutate(self, chunk: bytes, rng: random.Random) -> bytes:
+        """
+        Substitute each base with probability @error@ by one of the
+        three other bases, jumping straight from one error to the next
+        with geometric gaps.
+        """
+        mutable = bytearray(chunk)
+        scale = math.log(1 - self.error) if self.error < 1 else -math.inf
+        pos = -1
+
+        while True:
+            pos += 1 + int(math.log(1 - rng.random()) / scale)
+            if pos >= len(mutable):
+                break
+            mutable[pos] = b"ACGT"[(CODES[mutable[pos]] + 1 + rng.randrange(3)) & 3]
+
+        return bytes(mutable)
+
+
+def shard(workload: Workload, seed: int, index: int, count: int, length: int) -> bytes:
+    """
+    Generate shard @index@: @count@ newline-terminated sequences. The
+    shard's generator is seeded from (@seed@, @index@) alone, so the
+    output does not depend on how shards are spread over processes.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    return b"".join(workload.sequence(length, rng) + b"\n" for _ in range(count))
+
+
+def generate(out: BinaryIO, number: int, length: int, workload: Workload,
+             seed: int = 0, workers: int = 1) -> None:
+    """
+    Write @number@ sequences of @length@ bases to @out@, generating
+    shards in @workers@ processes and writing them in order.
+    """
+    shards = [(i, min(SHARD_SIZE, number - start))
+              for i, start in enumerate(range(0, number, SHARD_SIZE))]
+
+    if workers <= 1:
+        for index, count in shards:
+            out.write(shard(workload, seed, index, count, length))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(shard, *zip(*[(workload, seed, index, count, length)
+                                            for index, count in shards])):
+            out.write(chunk)
 
 
 if __name__ == "__main__":
@@ -25,6 +136,24 @@ if __name__ == "__main__":
     parser.add_argument(
         "--length", type=int, required=True, help="The length of each sequence."
     )
+    parser.add_argument(
+        "--output", type=str, help="File to write to (default: standard output)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Seed the PRNG."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes generating shards."
+    )
+    parser.add_argument(
+        "--repeat", type=float, default=0.0, help="Fraction of bases copied from repeat elements."
+    )
+    parser.add_argument(
+        "--skew", type=float, default=0.0, help="Zipf exponent for choosing repeat elements."
+    )
+    parser.add_argument(
+        "--error", type=float, default=0.0, help="Per-base substitution error rate."
+    )
     args = parser.parse_args()
 
     # No arguments passed
@@ -33,5 +162,10 @@ if __name__ == "__main__":
         sys.exit(-1)
 
     # Generate...
-    for _ in range(args.number):
-        print(DNA(args.length))
+    workload = Workload(args.repeat, args.skew, args.error, seed=args.seed)
+
+    if args.output:
+        with open(args.output, "wb", buffering=1 << 20) as out:
+            generate(out, args.number, args.length, workload, args.seed, args.workers)
+    else:
+        generate(sys.stdout.buffer, args.number, args.length, workload, args.seed, args.workers)
@@ -0,0 +1,172 @@
+"""
+MallocLabs K-mer Querying Structure: external-memory counting
+
+Counts the k-mers of an input too large to count in memory in one go.
+A streaming pass cuts every sequence into super-k-mers (runs of
+consecutive k-mers that share a minimizer) and appends each one to one
+of P partition files chosen by its minimizer, so every k-mer lands in a
+single partition while being written out only once. Each partition is
+then counted on its own, and the sorted partition counts are merged.
+
+Minimizers group k-mers by content, not by key, so the partition counts
+overlap in key range and are k-way merged rather than concatenated.
+
+A small memory limit on a large input can ask for more partitions than
+the process may hold open files, so partitions are written in passes
+over the input, each with at most open_file_budget() files open.
+"""
+
+import math
+import os
+import tempfile
+from array import array
+from collections import deque
+from typing import Any, Callable, Iterator
+
+from malloclabs import kmer_input
+from structures.hashing import FIBONACCI, MASK64
+
+try:
+    import resource
+except ImportError:     # Not available on Windows
+    resource = None
+
+CODES = {"A": 0, "C": 1, "G": 2, "T": 3}
+OPEN_FILE_HEADROOM = 64     # Descriptors left for everything else
+DEFAULT_OPEN_FILES = 512    # Assumed when the limit is unknown or unlimited
+MIN_PARTITION_BUFFER = 512  # Write buffer per open partition file, at least
+
+
+def open_file_budget() -> int:
+    """
+    Return how many partition files may be open at once: the soft
+    RLIMIT_NOFILE less some headroom, and at least one.
+    """
+    limit = DEFAULT_OPEN_FILES
+    if resource is not None:
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != resource.RLIM_INFINITY:
+            limit = soft
+    return max(1, limit - OPEN_FILE_HEADROOM)
+
+
+def scramble(value: int) -> int:
+    """
+    Mix the bits of a packed m-mer, so minimizers are not biased
+    towards runs of A.
+    """
+    value = (value * FIBONACCI) & MASK64
+    return value ^ (value >> 29)
+
+
+def super_kmers(sequence: str, k: int, m: int) -> Iterator[tuple[int, str]]:
+    """
+    Yield (minimizer, super-k-mer) pairs covering every k-mer of a
+    sequence once. The minimizer of a k-mer is the smallest scrambled
+    m-mer inside it, found with a monotone queue, so each base costs
+    O(1) amortized.
+    """
+    mask = (1 << (2 * m)) - 1
+    window: deque[tuple[int, int]] = deque()    # (position, scrambled m-mer)
+    value = 0
+    start = 0       # First k-mer of the current super-k-mer
+    current: tuple[int, int] | None = None
+
+    for i, base in enumerate(sequence):
+        value = ((value << 2) | CODES[base]) & mask
+        if i < m - 1:
+            continue
+
+        hashed = scramble(value)
+        while window and window[-1][1] > hashed:
+            window.pop()
+        window.append((i - m + 1, hashed))
+
+        # The k-mer ending here starts at i - k + 1
+        first = i - k + 1
+        if first < 0:
+            continue
+        while window[0][0] < first:
+            window.popleft()
+
+        if current is None:
+            current, start = window[0], first
+        elif window[0][0] != current[0]:
+            yield current[1], sequence[start:first - 1 + k]
+            current, start = window[0], first
+
+    if current is not None:
+        yield current[1], sequence[start:]
+
+
+def partition(infile: str, directory: str, parts: int, k: int, m: int,
+              max_open: int | None = None, buffer_bytes: int | None = None) -> list[str]:
+    """
+    Split the sequences of @infile@ (in any format kmer_input reads)
+    into super-k-mers, one per line, across @parts@ files in
+    @directory@. Return the file paths.
+    At most @max_open@ files (default open_file_budget()) are open at
+    once; with more parts, the input is read once per batch of files.
+    The open files share about @buffer_bytes@ of write buffers (by
+    default each gets Python's usual 8 KiB), since with hundreds of
+    partitions the buffers alone can outgrow a small memory limit.
+    """
+    if max_open is None:
+        max_open = open_file_budget()
+    paths = [os.path.join(directory, f"part{i}.txt") for i in range(parts)]
+    buffering = -1
+    if buffer_bytes is not None:
+        buffering = max(MIN_PARTITION_BUFFER, buffer_bytes // min(parts, max_open))
+
+    for first in range(0, parts, max_open):
+        last = min(first + max_open, parts)
+        files = [open(path, "wb", buffering=buffering) for path in paths[first:last]]
+        try:
+            for fragment in kmer_input.sequences(infile, k):
+                for minimizer, chunk in super_kmers(fragment.decode("ascii"), k, m):
+                    part = minimizer % parts
+                    if first <= part < last:
+                        files[part - first].write(chunk.encode("ascii") + b"\n")
+        finally:
+            for file in files:
+                file.close()
+
+    return paths
+
+
+def count_external(infile: str, k: int, canonical: bool, memory_limit: int,
+                   counter: Callable[..., tuple[Any, Any]],
+                   merger: Callable[[list[tuple[Any, Any]]], tuple[Any, Any]],
+                   bytes_per_kmer: int, minimizer: int = 11,
+                   tmpdir: str | None = None,
+                   max_open: int | None = None) -> tuple[Any, Any]:
+    """
+    Count the k-mers of @infile@ as sorted (keys, counts), holding about
+    @memory_limit@ bytes of raw k-mers at a time. @counter@ counts one
+    partition file like count_range, @merger@ merges the sorted
+    partition counts, and @bytes_per_kmer@ is what @counter@ spends per
+    raw k-mer. Partition files live in a temporary directory under
+    @tmpdir@ and are removed afterwards; @max_open@ is as for partition.
+    Merging the partition counts takes memory in proportion to the
+    distinct k-mers, like the counts themselves.
+    """
+    # Every byte of input starts at most one k-mer
+    raw = kmer_input.estimated_size(infile) * bytes_per_kmer
+    parts = max(1, math.ceil(raw / memory_limit))
+    m = min(minimizer, k)
+    runs: list[tuple[Any, Any]] = []
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        for path in partition(infile, directory, parts, k, m, max_open, memory_limit):
+            # Super-k-mers overlap by k - 1 bases, so a partition can hold
+            # more bytes than its share of the input; count it in pieces
+            pieces = math.ceil(os.path.getsize(path) * bytes_per_kmer / memory_limit)
+            keys, counts = merger([counter(path, start, stop, k, canonical)
+                                   for start, stop in kmer_input.split_lines(path, max(1, pieces))])
+            os.remove(path)
+            # Plain lists are compacted while the other partitions run
+            if isinstance(keys, list) and k <= 32:
+                keys, counts = array("Q", keys), array("q", counts)
+            runs.append((keys, counts))
+
+    return merger(runs)
@@ -0,0 +1,73 @@
+"""
+MallocLabs K-mer Querying Structure: frozen snapshots
+
+The compressed arrays behind KmerStore.freeze(). Keys are Elias-Fano
+coded against the 4^k possible k-mers, counts are bit-packed at the
+width of the largest count, and the prefix sums of the counts are only
+sampled, every PREFIX_SAMPLE keys, with the rest added up on demand.
+"""
+
+from array import array
+from typing import Sequence
+
+from structures.elias_fano import EliasFano
+from structures.packed_array import PackedArray
+
+PREFIX_SAMPLE = 64
+
+
+class SampledPrefix:
+    """
+    The prefix sums of a count array, answering prefix[i] ==
+    sum(counts[:i]) from the sample at or below i plus at most
+    PREFIX_SAMPLE - 1 counts.
+    """
+
+    def __init__(self, counts: Sequence[int]) -> None:
+        self._counts: Sequence[int] = counts
+        self._samples: array = array("q", [0])
+        total = 0
+
+        for i, count in enumerate(counts, 1):
+            total += count
+            if i % PREFIX_SAMPLE == 0:
+                self._samples.append(total)
+
+        self._total: int = total
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Return sum(counts[:index]); index -1 is the total.
+        Time complexity: O(PREFIX_SAMPLE)
+        """
+        if index < 0:
+            index += len(self._counts) + 1
+        if index == len(self._counts):
+            return self._total
+
+        block = index // PREFIX_SAMPLE
+        total = self._samples[block]
+        for i in range(block * PREFIX_SAMPLE, index):
+            total += self._counts[i]
+        return total
+
+    def __len__(self) -> int:
+        return len(self._counts) + 1
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The bytes held by the samples.
+        """
+        return len(self._samples) * self._samples.itemsize
+
+
+def freeze(keys: Sequence[int], counts: Sequence[int],
+           k: int) -> tuple[EliasFano, PackedArray, SampledPrefix]:
+    """
+    Compress sorted distinct keys of k-mers and their counts.
+    Time complexity: O(n)
+    """
+    frozen_keys = EliasFano([int(key) for key in keys], 1 << (2 * k))
+    frozen_counts = PackedArray([int(count) for count in counts])
+    return frozen_keys, frozen_counts, SampledPrefix(frozen_counts)
@@ -0,0 +1,150 @@
+"""
+MallocLabs K-mer Querying Structure: input formats
+
+Streams the sequence data out of an input file as fragments: maximal
+runs of A, C, G and T, at least k bases long. The file may be plain
+text (one sequence per line), FASTA (headers, sequences wrapped over
+many lines) or FASTQ (four-line records), and any of them may be
+gzipped; the format is detected from the first bytes. Lower-case bases
+are read as upper-case, and anything else (such as N) breaks a k-mer.
+
+Gzipped input is decompressed incrementally and wrapped FASTA lines are
+joined by carrying only the last k - 1 bases of a line onto the next,
+so no record, let alone the whole file, is ever held in memory.
+"""
+
+import gzip
+import os
+import re
+from typing import BinaryIO, Iterator
+
+GZIP_MAGIC = b"\x1f\x8b"
+BASE_RUN = re.compile(rb"[ACGT]+")
+
+# Detected formats
+LINES = "lines"
+FASTA = "fasta"
+FASTQ = "fastq"
+
+# Typical compression ratio of gzipped sequence data, for size estimates
+GZIP_RATIO = 4
+
+
+def is_gzip(infile: str) -> bool:
+    """
+    Return True if @infile@ starts with the gzip magic number.
+    """
+    with open(infile, "rb") as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def open_input(infile: str) -> BinaryIO:
+    """
+    Open @infile@ for binary reading, decompressing it on the fly if it
+    is gzipped.
+    """
+    if is_gzip(infile):
+        return gzip.open(infile, "rb") # type: ignore
+    return open(infile, "rb")
+
+
+def detect(infile: str) -> str:
+    """
+    Return the format of @infile@: FASTA if its first non-blank byte is
+    '>', FASTQ if it is '@', and plain lines otherwise.
+    """
+    with open_input(infile) as f:
+        for line in f:
+            first = line.lstrip()[:1]
+            if first:
+                return {b">": FASTA, b"@": FASTQ}.get(first, LINES)
+    return LINES
+
+
+def estimated_size(infile: str) -> int:
+    """
+    Return roughly how many bytes of text @infile@ holds once
+    decompressed, for sizing structures ahead of a read.
+    """
+    size = os.path.getsize(infile)
+    return size * GZIP_RATIO if is_gzip(infile) else size
+
+
+def split_lines(infile: str, parts: int) -> list[tuple[int, int]]:
+    """
+    Split a file into at most @parts@ byte ranges that each start at
+    the beginning of a line.
+    """
+    size = os.path.getsize(infile)
+    bounds = [0]
+
+    with open(infile, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            pos = min(f.tell(), size)
+            if pos > bounds[-1]:
+                bounds.append(pos)
+
+    if bounds[-1] < size:
+        bounds.append(size)
+
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def fragments(line: bytes, k: int) -> Iterator[bytes]:
+    """
+    Yield the runs of bases in @line@ that hold at least one k-mer.
+    """
+    for run in BASE_RUN.findall(line.upper()):
+        if len(run) >= k:
+            yield run
+
+
+def sequences(infile: str, k: int) -> Iterator[bytes]:
+    """
+    Yield every fragment of @infile@ in file order, whatever its format.
+    Together the fragments hold each k-mer occurrence of the file once.
+    """
+    fmt = detect(infile)
+
+    with open_input(infile) as f:
+        if fmt == FASTA:
+            yield from _fasta(f, k)
+        elif fmt == FASTQ:
+            yield from _fastq(f, k)
+        else:
+            for line in f:
+                yield from fragments(line, k)
+
+
+def _fasta(f: BinaryIO, k: int) -> Iterator[bytes]:
+    carry = b""
+
+    for line in f:
+        if line.startswith(b">"):
+            carry = b""
+            continue
+
+        # Every k-mer of chunk ends inside line, so none is seen twice
+        chunk = carry + line.strip().upper()
+        runs = BASE_RUN.findall(chunk)
+        for run in runs:
+            if len(run) >= k:
+                yield run
+
+        if runs and chunk.endswith(runs[-1]) and k > 1:
+            carry = runs[-1][-(k - 1):]
+        else:
+            carry = b""
+
+
+def _fastq(f: BinaryIO, k: int) -> Iterator[bytes]:
+    for header in f:
+        if not header.strip():
+            continue
+        # Sequence, then the '+' separator and quality line, skipped
+        sequence = next(f, b"")
+        next(f, None)
+        next(f, None)
+        yield from fragments(sequence, k)
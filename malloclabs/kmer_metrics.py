@@ -0,0 +1,122 @@
+"""
+MallocLabs K-mer Querying Structure: instrumentation
+
+Per-operation call counts and latencies for KmerStore, and cProfile
+hooks around chosen operations. Everything here is opt-in: a store with
+metrics disabled and nothing being profiled pays one attribute check
+per call.
+"""
+
+import functools
+import random
+import threading
+import time
+from typing import Any, Callable
+
+# Latency samples kept per operation, by reservoir sampling beyond this
+SAMPLE_LIMIT = 100_000
+
+
+class OperationMetrics:
+    """
+    Call counts, total time and a bounded latency sample for each
+    operation, plus the k-mers ingested and the time spent ingesting.
+    Safe to record from several threads, as concurrent readers do.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, int] = {}
+        self._seconds: dict[str, float] = {}
+        self._samples: dict[str, list[float]] = {}
+        self._ingested: int = 0
+        self._ingest_seconds: float = 0.0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, elapsed: float, ingested: int = 0) -> None:
+        """
+        Record one call of @operation@ that took @elapsed@ seconds and
+        added @ingested@ k-mer occurrences.
+        Time complexity: O(1)
+        """
+        with self._lock:
+            calls = self._calls.get(operation, 0) + 1
+            self._calls[operation] = calls
+            self._seconds[operation] = self._seconds.get(operation, 0.0) + elapsed
+
+            samples = self._samples.setdefault(operation, [])
+            if len(samples) < SAMPLE_LIMIT:
+                samples.append(elapsed)
+            else:
+                slot = self._rng.randrange(calls)
+                if slot < SAMPLE_LIMIT:
+                    samples[slot] = elapsed
+
+            if ingested:
+                self._ingested += ingested
+                self._ingest_seconds += elapsed
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Return the calls, total seconds and p50/p99 latency in seconds
+        of every operation, and the ingest rate in k-mers per second.
+        """
+        # Copy under the lock, sort outside it
+        with self._lock:
+            samples = {operation: list(values) for operation, values in self._samples.items()}
+            calls = dict(self._calls)
+            seconds = dict(self._seconds)
+            ingested, ingest_seconds = self._ingested, self._ingest_seconds
+
+        operations = {}
+        for operation, values in samples.items():
+            ordered = sorted(values)
+            operations[operation] = {
+                "calls": calls[operation],
+                "total_seconds": seconds[operation],
+                "p50_seconds": ordered[(len(ordered) - 1) // 2],
+                "p99_seconds": ordered[(len(ordered) - 1) * 99 // 100],
+            }
+
+        rate = ingested / ingest_seconds if ingest_seconds else 0.0
+        return {
+            "operations": operations,
+            "ingested": ingested,
+            "kmers_per_second": rate,
+        }
+
+
+def instrumented(operation: str, ingest: bool = False) -> Callable:
+    """
+    Decorate a KmerStore method so its calls are recorded under
+    @operation@ when the store has metrics enabled, and run under the
+    store's profiler for @operation@ when there is one. With @ingest@,
+    the growth of the store's total count is recorded as k-mers ingested.
+    """
+    def wrap(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def timed(self, *args: Any, **kwargs: Any) -> Any:
+            metrics = self._metrics
+            profiler = self._profilers.get(operation) if self._profilers else None
+
+            if metrics is None and profiler is None:
+                return method(self, *args, **kwargs)
+
+            before = self._total() if ingest and metrics is not None else 0
+            started = time.perf_counter()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                if metrics is not None:
+                    elapsed = time.perf_counter() - started
+                    ingested = self._total() - before if ingest else 0
+                    metrics.record(operation, elapsed, ingested)
+
+        return timed
+
+    return wrap
+
@@ -0,0 +1,223 @@
+"""
+MallocLabs K-mer Querying Structure: NumPy backend
+
+Vectorised versions of the array work behind KmerStore. Keys are packed
+k-mers in uint64 arrays (so k <= 32) and counts are int64 arrays.
+Importing this module requires NumPy; KmerStore only does so when it is
+available.
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+# Input bytes to base codes, with 4 marking anything that is not a base
+LOOKUP = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate(b"ACGT"):
+    LOOKUP[_base] = _code
+    LOOKUP[_base | 0x20] = _code
+
+BLOCK_SIZE = 1 << 24
+# Peak bytes per input byte of counting a block (pack_block, then
+# collapse), measured with tracemalloc, with the block itself
+PACK_BYTES_PER_BASE = 32
+EMPTY_KEYS = np.empty(0, dtype=np.uint64)
+EMPTY_COUNTS = np.empty(0, dtype=np.int64)
+
+
+def as_keys(packed: list[int]) -> np.ndarray:
+    """
+    Convert a list of packed k-mers into a key array.
+    """
+    return np.array(packed, dtype=np.uint64)
+
+
+def as_counts(counts: list[int]) -> np.ndarray:
+    """
+    Convert a list of counts into a count array.
+    """
+    return np.array(counts, dtype=np.int64)
+
+
+def pack_block(data: bytes, k: int, canonical: bool = False) -> np.ndarray:
+    """
+    Return the packed k-mers of a block of raw input, skipping every
+    window that contains a byte other than a base (such as a newline).
+    Temporaries are kept narrow, so packing L bytes peaks at about
+    PACK_BYTES_PER_BASE * L bytes.
+    Time complexity: O(k L) vectorised work for a block of L bytes
+    """
+    codes = LOOKUP[np.frombuffer(data, dtype=np.uint8)]
+    n = len(codes) - k + 1
+
+    if n <= 0:
+        return EMPTY_KEYS
+
+    # A window is valid when it covers no invalid byte
+    invalid = np.zeros(len(codes) + 1, dtype=np.int32)
+    np.cumsum(codes > 3, out=invalid[1:])
+    valid = invalid[k:] == invalid[:-k]
+    del invalid
+
+    codes &= 3
+    keys = np.zeros(n, dtype=np.uint64)
+    two = np.uint64(2)
+
+    for j in range(k):
+        keys <<= two
+        keys |= codes[j:j + n]
+
+    if canonical:
+        rc = np.zeros(n, dtype=np.uint64)
+        scratch = np.empty(n, dtype=np.uint64)
+        for j in range(k):
+            np.subtract(3, codes[j:j + n], out=scratch, casting="unsafe")
+            scratch <<= np.uint64(2 * j)
+            rc |= scratch
+        del scratch
+        np.minimum(keys, rc, out=keys)
+        del rc
+
+    return keys[valid]
+
+
+def collapse(packed: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sort packed k-mers in place and collapse them into distinct keys
+    and counts.
+    Time complexity: O(m log m)
+    """
+    if len(packed) == 0:
+        return EMPTY_KEYS, EMPTY_COUNTS
+
+    packed.sort()
+    starts = np.flatnonzero(np.concatenate(([True], packed[1:] != packed[:-1])))
+    counts = np.diff(np.append(starts, len(packed))).astype(np.int64)
+    return packed[starts], counts
+
+
+def merge_runs(runs: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge sorted, collapsed runs into one, adding the counts of keys
+    that appear in more than one run. The stable sort is a timsort that
+    finds the sorted runs, so this is close to a linear merge.
+    """
+    runs = [run for run in runs if len(run[0])]
+
+    if not runs:
+        return EMPTY_KEYS, EMPTY_COUNTS
+
+    keys = np.concatenate([np.asarray(run[0], dtype=np.uint64) for run in runs])
+    counts = np.concatenate([np.asarray(run[1], dtype=np.int64) for run in runs])
+
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    counts = counts[order]
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+def count_range(infile: str, start: int, stop: int, k: int,
+                canonical: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count the k-mers in the byte range [start, stop) of a file, reading
+    it in fixed-size blocks that overlap by k - 1 bytes.
+    """
+    runs: list[tuple[np.ndarray, np.ndarray]] = []
+    carry = b""
+
+    with open(infile, "rb") as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            data = f.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            block = carry + data
+            runs.append(collapse(pack_block(block, k, canonical)))
+            carry = block[len(block) - k + 1:] if k > 1 else b""
+
+    return merge_runs(runs)
+
+
+def count_sequences(fragments: Iterator[bytes], k: int,
+                    canonical: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count the k-mers of a stream of fragments (see kmer_input), packing
+    them a block at a time with a newline between fragments.
+    """
+    runs: list[tuple[np.ndarray, np.ndarray]] = []
+    pending: list[bytes] = []
+    size = 0
+
+    for fragment in fragments:
+        pending.append(fragment)
+        size += len(fragment) + 1
+        if size >= BLOCK_SIZE:
+            runs.append(collapse(pack_block(b"\n".join(pending), k, canonical)))
+            pending, size = [], 0
+
+    if pending:
+        runs.append(collapse(pack_block(b"\n".join(pending), k, canonical)))
+
+    return merge_runs(runs)
+
+
+def delete_keys(keys: np.ndarray, counts: np.ndarray,
+                remove: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Drop every key in @remove@ along with its count.
+    """
+    keep = ~np.isin(keys, remove)
+    return keys[keep], counts[keep]
+
+
+def derive(keys: np.ndarray, counts: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the prefix sums of the counts and the counts per leading base
+    pair. Keys are sorted, so each pair is a contiguous range.
+    """
+    prefix = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    if k < 2:
+        # No leading pair to count by
+        return prefix, np.zeros(16, dtype=np.int64)
+    bounds = np.arange(1, 16, dtype=np.uint64) << np.uint64(2 * k - 4)
+    starts = np.concatenate(([0], np.searchsorted(keys, bounds), [len(keys)]))
+    return prefix, prefix[starts[1:]] - prefix[starts[:-1]]
+
+
+def find(keys: np.ndarray, key: int) -> int:
+    """
+    Return the position of the first key >= @key@.
+    """
+    return int(np.searchsorted(keys, np.uint64(key)))
+
+
+def find_many(keys: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Return the position of the first key >= each query.
+    """
+    return np.searchsorted(keys, queries)
+
+
+def count_many(keys: np.ndarray, counts: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Return the count of each query, or 0 where it is not stored.
+    """
+    if len(keys) == 0:
+        return np.zeros(len(queries), dtype=np.int64)
+
+    positions = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return np.where(keys[positions] == queries, counts[positions], 0)
+
+
+def freq_index(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return the key positions ordered by count, the distinct counts, and
+    where each distinct count starts (with a trailing sentinel).
+    """
+    order = np.argsort(counts, kind="stable")
+    buckets, first = np.unique(counts[order], return_index=True)
+    return order, buckets, np.append(first, len(order))
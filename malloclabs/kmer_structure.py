@@ -6,15 +6,463 @@ Joel Mackenzie and Vladimir Morozov
 MallocLabs K-mer Querying Structure
 """
 
-from typing import Any
+import cProfile
+import heapq
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+from malloclabs import kmer_frozen, kmer_input
+from malloclabs.count_min import CountMinSketch
+from malloclabs.kmer_external import count_external
+from malloclabs.kmer_metrics import OperationMetrics, instrumented
+
+try:
+    from malloclabs import kmer_numpy
+except ImportError:
+    kmer_numpy = None
 
 """
 You may wish to import your data structures to help you with some of the
 problems. Or maybe not.
 """
 from structures.bit_vector import BitVector
+from structures.bloom_filter import BloomFilter
 from structures.dynamic_array import DynamicArray
+from structures.elias_fano import EliasFano
 from structures.linked_list import DoublyLinkedList, Node
+from structures.memory import memory_summary
+
+
+# Two bits per base; A < C < G < T so packed order is lexicographic order
+ENCODE = {"A": 0, "C": 1, "G": 2, "T": 3}
+DECODE = "ACGT"
+
+# On-disk index: header, then keys, counts, prefix sums and the leading
+# pair table as little-endian 64-bit arrays. The CRC covers the header
+# fields before it, then the arrays.
+MAGIC = b"KMER"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sIIIQQI4x")  # magic, version, k, flags, n, total, crc
+CHECKED_HEADER = HEADER.size - 8       # every header byte before the crc
+FLAG_CANONICAL = 1
+
+
+def pack_kmers(sequence: str, k: int, canonical: bool = False) -> Iterator[int]:
+    """
+    Yield every packed k-mer of a sequence using a rolling window,
+    so each base costs O(1) regardless of k.
+    With @canonical@, the reverse complement is rolled alongside and the
+    smaller of the two is yielded instead.
+    """
+    mask = (1 << (2 * k)) - 1
+    top = 2 * (k - 1)
+    key = 0
+    rc = 0
+
+    for i, base in enumerate(sequence):
+        code = ENCODE[base]
+        key = ((key << 2) | code) & mask
+        if canonical:
+            rc = (rc >> 2) | ((3 - code) << top)
+        if i >= k - 1:
+            yield min(key, rc) if canonical else key
+
+
+def encode(kmer: str, k: int, canonical: bool = False) -> int:
+    """
+    Pack a k-mer into an integer, two bits per base. With @canonical@,
+    pack the smaller of the k-mer and its reverse complement.
+    """
+    key = 0
+    for base in kmer:
+        key = (key << 2) | ENCODE[base]
+
+    if canonical:
+        return min(key, reverse_complement(key, k))
+
+    return key
+
+
+def decode(key: int, k: int) -> str:
+    """
+    Unpack an integer back into its k-mer.
+    """
+    key = int(key)
+    bases = [""] * k
+    for i in range(k - 1, -1, -1):
+        bases[i] = DECODE[key & 3]
+        key >>= 2
+    return "".join(bases)
+
+
+def reverse_complement(key: int, k: int) -> int:
+    """
+    Return the packed reverse complement of a packed k-mer.
+    Time complexity: O(k)
+    """
+    rc = 0
+    for _ in range(k):
+        rc = (rc << 2) | (3 - (key & 3))
+        key >>= 2
+    return rc
+
+
+def collapse(packed: list[int]) -> tuple[list[int], list[int]]:
+    """
+    Collapse a sorted list of packed k-mers into parallel lists of
+    distinct keys and their number of occurrences.
+    Time complexity: O(m)
+    """
+    keys: list[int] = []
+    counts: list[int] = []
+
+    for key in packed:
+        if keys and keys[-1] == key:
+            counts[-1] += 1
+        else:
+            keys.append(key)
+            counts.append(1)
+
+    return keys, counts
+
+
+def merge_runs(runs: list[tuple[list[int], list[int]]]) -> tuple[list[int], list[int]]:
+    """
+    K-way merge sorted, collapsed runs into one, adding the counts of
+    keys that appear in more than one run.
+    Time complexity: O(N log r) for N keys over r runs
+    """
+    keys: list[int] = []
+    counts: list[int] = []
+
+    for key, count in heapq.merge(*(zip(*run) for run in runs)):
+        if keys and keys[-1] == key:
+            counts[-1] += count
+        else:
+            keys.append(key)
+            counts.append(count)
+
+    return keys, counts
+
+
+def gallop(keys: Sequence[int], key: int, lo: int) -> int:
+    """
+    Return the position of the first key >= @key@ at or after @lo@,
+    probing lo, lo + 1, lo + 3, lo + 7, ... before a binary search.
+    A run of sorted queries therefore costs O(log d) each for a gap
+    of d keys between consecutive answers.
+    """
+    hi = lo
+    step = 1
+
+    while hi < len(keys) and keys[hi] < key:
+        lo = hi + 1
+        hi += step
+        step *= 2
+
+    return bisect_left(keys, key, lo, min(hi, len(keys)))
+
+
+def count_range(infile: str, start: int, stop: int, k: int,
+                canonical: bool = False) -> tuple[list[int], list[int]]:
+    """
+    Count the k-mers of the lines in the byte range [start, stop) of a
+    file as a sorted, collapsed run. This is the unit of work for a
+    parallel KmerStore.read.
+    """
+    packed: list[int] = []
+
+    with open(infile, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < stop:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            for fragment in kmer_input.fragments(line, k):
+                packed.extend(pack_kmers(fragment.decode("ascii"), k, canonical))
+
+    packed.sort()
+    return collapse(packed)
+
+
+def count_sequences(fragments: Iterator[bytes], k: int,
+                    canonical: bool = False) -> tuple[list[int], list[int]]:
+    """
+    Count the k-mers of a stream of fragments (see kmer_input) as a
+    sorted, collapsed run.
+    """
+    packed: list[int] = []
+
+    for fragment in fragments:
+        packed.extend(pack_kmers(fragment.decode("ascii"), k, canonical))
+
+    packed.sort()
+    return collapse(packed)
+
+
+class KmerSnapshot:
+    """
+    One immutable generation of a KmerStore's exact arrays: the sorted
+    distinct keys, their counts, a prefix sum of the counts (for
+    count_geq) and a table of counts per leading base pair (for
+    compatible). A count-ordered index for freq_geq is built lazily on
+    the first query that needs it.
+
+    A frozen snapshot (see KmerStore.freeze) holds the same arrays in
+    compressed form: Elias-Fano keys, bit-packed counts and sampled
+    prefix sums. It answers every query, in O(log n), except that
+    freq_geq scans the keys in order instead of building an index.
+
+    Nothing here is modified after construction (the lazy index is
+    swapped in as one reference), so any number of threads can query a
+    snapshot without locks while the store publishes newer ones.
+    """
+
+    def __init__(self, ident: int, k: int, canonical: bool, numpy: bool,
+                 keys: Sequence[int], counts: Sequence[int],
+                 prefix: Sequence[int] | None = None,
+                 lead: Sequence[int] | None = None,
+                 buffer: mmap.mmap | None = None) -> None:
+        self._id: int = ident
+        self._k: int = k
+        self._canonical: bool = canonical
+        self._numpy: bool = numpy
+        # Lists, NumPy arrays, or read-only views of a mapped index
+        self._keys: Sequence[int] = keys        # Sorted distinct packed k-mers
+        self._counts: Sequence[int] = counts    # Occurrences of _keys[i]
+        self._mmap: mmap.mmap | None = buffer   # Keeps mapped views valid
+        self._frozen: bool = isinstance(keys, EliasFano)
+        # freq_geq index: key positions by count, distinct counts, starts
+        self._freq: tuple[Sequence[int], Sequence[int], Sequence[int]] | None = None
+
+        if prefix is None or lead is None:
+            prefix, lead = self._derive()
+
+        self._prefix: Sequence[int] = prefix    # _prefix[i] == sum(_counts[:i])
+        self._lead: Sequence[int] = lead        # Occurrences per leading base pair
+
+    def get_id(self) -> int:
+        """
+        Return the generation number; each published update adds one.
+        """
+        return self._id
+
+    def get_size(self) -> int:
+        """
+        Return n, the number of distinct k-mers in the snapshot.
+        Time complexity: O(1)
+        """
+        return len(self._keys)
+
+    def is_frozen(self) -> bool:
+        """
+        Return True if the arrays are held in compressed form.
+        """
+        return self._frozen
+
+    def count(self, kmer: str) -> int:
+        """
+        Return the number of times a k-mer appears.
+        Time complexity: O(log n)
+        """
+        return self._count_key(encode(kmer, self._k, self._canonical))
+
+    def count_geq(self, kmer: str) -> int:
+        """
+        Return the total number of k-mers that are lexicographically
+        greater or equal.
+        Time complexity: O(log n)
+        """
+        index = self._find(encode(kmer, self._k, self._canonical))
+        return int(self._prefix[-1] - self._prefix[index])
+
+    def compatible(self, kmer: str) -> int:
+        """
+        Return the number of k-mers whose first two characters pair
+        with the last two characters of @kmer@ (A with T, C with G).
+        With k < 2 there are no such characters, so this is 0.
+        Time complexity: O(1)
+        """
+        if self._k < 2:
+            return 0
+        first = 3 - ENCODE[kmer[-2]]
+        second = 3 - ENCODE[kmer[-1]]
+        return int(self._lead[first * 4 + second])
+
+    def freq_geq(self, m: int) -> Iterator[str]:
+        """
+        Lazily yield the k-mers that occur >= m times, in increasing
+        order of count.
+        Time complexity: O(log n + output), plus an O(n log n) build of
+        the count index on the first call.
+        A frozen snapshot yields them in key order, by an O(n) scan.
+        """
+        if self._frozen:
+            for key, count in zip(self._keys, self._counts):
+                if count >= m:
+                    yield decode(key, self._k)
+            return
+
+        if self._freq is None:
+            self._freq = self._build_freq_index()
+
+        order, buckets, starts = self._freq
+        start = starts[bisect_left(buckets, m)]
+
+        for i in range(start, len(order)):
+            yield decode(self._keys[order[i]], self._k)
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        """
+        Lazily yield every (k-mer, count) pair in lexicographic order.
+        Time complexity: O(n)
+        """
+        for key, count in zip(self._keys, self._counts):
+            yield decode(key, self._k), int(count)
+
+    def count_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return count(kmer) for each of m k-mers, in the same order.
+        The queries are sorted and answered by one galloping merge
+        against the keys.
+        Time complexity: O(m log m + min(n, m log n))
+        """
+        packed = [encode(kmer, self._k, self._canonical) for kmer in kmers]
+
+        if self._numpy:
+            return kmer_numpy.count_many(self._keys, self._counts, kmer_numpy.as_keys(packed)).tolist() # type: ignore
+
+        answers = [0] * len(packed)
+        for i, index in enumerate(self._find_many(packed)):
+            if index < len(self._keys) and self._keys[index] == packed[i]:
+                answers[i] = self._counts[index]
+        return answers
+
+    def count_geq_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return count_geq(kmer) for each of m k-mers, in the same order.
+        Time complexity: O(m log m + min(n, m log n))
+        """
+        packed = [encode(kmer, self._k, self._canonical) for kmer in kmers]
+        total = self._prefix[-1]
+        return [int(total - self._prefix[index]) for index in self._find_many(packed)]
+
+    def compatible_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return compatible(kmer) for each of m k-mers, in the same order.
+        Time complexity: O(m)
+        """
+        return [self.compatible(kmer) for kmer in kmers]
+
+    def _count_key(self, key: int) -> int:
+        index = self._find(key)
+
+        if index < len(self._keys) and int(self._keys[index]) == key:
+            return int(self._counts[index])
+
+        return 0
+
+    def _contains(self, key: int) -> bool:
+        index = self._find(key)
+        return index < len(self._keys) and int(self._keys[index]) == key
+
+    def _find(self, key: int) -> int:
+        """
+        Return the position of the first stored key >= @key@.
+        Time complexity: O(log n)
+        """
+        if self._numpy:
+            return kmer_numpy.find(self._keys, key) # type: ignore
+        if self._frozen:
+            return self._keys.find(key) # type: ignore
+
+        return bisect_left(self._keys, key)
+
+    def _find_many(self, packed: list[int]) -> Sequence[int]:
+        """
+        Return _find(key) for every key, in the same order, by visiting
+        the keys in sorted order and galloping forward from the
+        previous answer.
+        Time complexity: O(m log m + min(n, m log n))
+        """
+        if self._numpy:
+            return kmer_numpy.find_many(self._keys, kmer_numpy.as_keys(packed)).tolist() # type: ignore
+
+        positions = [0] * len(packed)
+        index = 0
+
+        for i in sorted(range(len(packed)), key=packed.__getitem__):
+            index = gallop(self._keys, packed[i], index)
+            positions[i] = index
+
+        return positions
+
+    def _arrays(self, numpy: bool) -> tuple[Sequence[int], Sequence[int]]:
+        """
+        Return the keys and counts as arrays an update can merge with:
+        NumPy arrays with @numpy@, otherwise anything sliceable.
+        Frozen arrays are decompressed.
+        Time complexity: O(1), or O(n) when frozen
+        """
+        if not self._frozen:
+            return self._keys, self._counts
+        if numpy:
+            return kmer_numpy.as_keys(list(self._keys)), kmer_numpy.as_counts(list(self._counts)) # type: ignore
+        return list(self._keys), list(self._counts)
+
+    def _derive(self) -> tuple[Sequence[int], Sequence[int]]:
+        """
+        Compute the prefix sums and the leading pair table.
+        Time complexity: O(n)
+        """
+        if self._numpy:
+            return kmer_numpy.derive(self._keys, self._counts, self._k) # type: ignore
+
+        prefix = [0] * (len(self._counts) + 1)
+        lead = [0] * 16
+        shift = 2 * self._k - 4
+
+        for i, count in enumerate(self._counts):
+            prefix[i + 1] = prefix[i] + count
+            # With k < 2 there is no leading pair to count by
+            if shift >= 0:
+                lead[self._keys[i] >> shift] += count
+
+        return prefix, lead
+
+    def _build_freq_index(self) -> tuple[Sequence[int], Sequence[int], Sequence[int]]:
+        """
+        Order the keys by count and record where each distinct count
+        starts, with a sentinel start for queries above every count.
+        Time complexity: O(n log n)
+        """
+        if self._numpy:
+            return kmer_numpy.freq_index(self._counts) # type: ignore
+
+        counts = self._counts
+        order = sorted(range(len(counts)), key=counts.__getitem__)
+        buckets: list[int] = []
+        starts: list[int] = []
+
+        for pos, index in enumerate(order):
+            if not buckets or buckets[-1] != counts[index]:
+                buckets.append(counts[index])
+                starts.append(pos)
+
+        starts.append(len(order))
+        return order, buckets, starts
 
 
 class KmerStore:
@@ -23,29 +471,187 @@ class KmerStore:
     You may add any additional functions or member variables
     as you see fit.
     At any moment, the structure is maintaining n distinct k-mers.
+
+    Each k-mer is packed into an integer with two bits per base. The
+    arrays live in an immutable KmerSnapshot. An update builds the next
+    snapshot off to the side and publishes it by swapping one reference,
+    so queries never take a lock and always see a single consistent
+    generation, even while another thread is merging a batch. Updates
+    are serialised among themselves by a lock. Call snapshot() to pin a
+    generation across several queries.
+
+    With @canonical@, a k-mer and its reverse complement are counted as
+    one key, stored as whichever of the two is lexicographically smaller.
+    Every k-mer argument is canonicalised the same way before use, so
+    count and batch_delete see both strands, count_geq compares canonical
+    forms, and freq_geq and compatible report the stored canonical k-mers.
+
+    With @approximate@, no k-mers are stored exactly. Counts go into a
+    @width@ x @depth@ Count-Min sketch (see CountMinSketch for the error
+    bound) and the at most @capacity@ k-mers with the highest estimates
+    are tracked as candidates for freq_geq, so memory is fixed by the
+    parameters. count and freq_geq then give upper bounds, compatible
+    stays exact, and count_geq, batch_delete and save are unsupported.
+    The sketch is updated in place, so it has no snapshot isolation.
+
+    With @prefilter@ set to a false-positive rate, read and batch_insert
+    drop the k-mers that occur only once in their input (unless they are
+    already stored). A Bloom filter admits a k-mer to the exact table on
+    its second sighting, and a second pass over the input then counts
+    the admitted k-mers exactly, discarding Bloom false positives, so
+    singletons never occupy the table.
+
+    The @backend@ holding the arrays is "numpy" (uint64 keys and int64
+    counts, worked on with vectorised sorts and searches) or "python"
+    (plain lists). "auto" picks NumPy whenever it can be imported and
+    k <= 32, except for approximate stores which keep no arrays.
+
+    freeze() compresses the current generation for read-mostly use (see
+    KmerSnapshot); the next update decompresses it again.
+
+    With @metrics@ (or after enable_metrics()), every public operation
+    records its calls and latency, reported by stats(). profile() runs
+    a chosen operation under cProfile.
     """
 
-    def __init__(self, k: int) -> None:
-        pass
+    def __init__(self, k: int, canonical: bool = False, approximate: bool = False,
+                 width: int = 1 << 20, depth: int = 4,
+                 capacity: int | None = None,
+                 prefilter: float | None = None, backend: str = "auto",
+                 metrics: bool = False) -> None:
+        if approximate and prefilter is not None:
+            raise ValueError("approximate KmerStores cannot be prefiltered")
+        if backend == "auto":
+            usable = kmer_numpy is not None and k <= 32 and not approximate
+            backend = "numpy" if usable else "python"
+        if backend == "numpy" and (kmer_numpy is None or k > 32 or approximate):
+            raise ValueError("the numpy backend needs NumPy, k <= 32 and an exact store")
+        if backend not in ("numpy", "python"):
+            raise ValueError(f"unknown backend {backend!r}")
+
+        self._k: int = k
+        self._canonical: bool = canonical
+        self._numpy: bool = backend == "numpy"
+        self._prefilter: float | None = prefilter
+        # Current generation; replaced, never modified
+        self._snapshot: KmerSnapshot = self._make_snapshot(0, [], [])
+        self._write_lock = threading.Lock()
+        # Update latency, in seconds
+        self._updates: int = 0
+        self._update_last: float = 0.0
+        self._update_total: float = 0.0
+        self._update_max: float = 0.0
+        # Opt-in instrumentation
+        self._metrics: OperationMetrics | None = OperationMetrics() if metrics else None
+        self._profilers: dict[str, cProfile.Profile] = {}
+        # Approximate mode only
+        self._sketch: CountMinSketch | None = None
+        self._lead: list[int] = [0] * 16        # Occurrences per leading base pair
+        self._candidates: dict[int, int] = {}   # Candidate key -> estimate
+        self._capacity: int = capacity if capacity is not None else width
+        self._floor: int = 0    # Highest estimate evicted from _candidates
 
-    def read(self, infile: str) -> None:
+        if approximate:
+            self._sketch = CountMinSketch(width, depth)
+
+    @instrumented("read", ingest=True)
+    def read(self, infile: str, workers: int = 1,
+             memory_limit: int | None = None, tmpdir: str | None = None,
+             expected_distinct: int | None = None) -> None:
         """
         Given a path to an input file, break the sequences into
         k-mers and load them into your data structure.
+        The file may hold one sequence per line, FASTA or FASTQ, and
+        may be gzipped (see kmer_input). It is streamed, and k-mers are
+        broken at anything other than a base, such as N.
+        With @workers@ > 1 an uncompressed one-per-line file is split at
+        line boundaries and each byte range is counted in its own
+        process; the sorted runs are then k-way merged into the structure.
+        With @memory_limit@ (in bytes), the k-mers are first spread over
+        minimizer partitions on disk under @tmpdir@ (see kmer_external),
+        so only one partition's raw k-mers are held at a time.
+        Approximate and prefiltered stores always stream the file in
+        this process.
+        A prefiltered store sizes its Bloom filter for
+        @expected_distinct@ distinct k-mers. By default that is the
+        number of k-mer occurrences, estimated from the input size, and
+        capped at the 4^k possible k-mers. On deep coverage this
+        oversizes the filter by about the coverage, so pass a better
+        estimate when one is known.
         """
-        pass
+        def stream() -> Iterator[int]:
+            for fragment in kmer_input.sequences(infile, self._k):
+                yield from pack_kmers(fragment.decode("ascii"), self._k, self._canonical)
+
+        if self._sketch is not None:
+            with self._write_lock:
+                for key in stream():
+                    self._add_estimate(key, 1)
+            return
+
+        if self._prefilter is not None:
+            if expected_distinct is None:
+                # Every byte starts at most one k-mer
+                expected_distinct = min(kmer_input.estimated_size(infile), 4 ** self._k)
+            self._insert_filtered(stream, expected_distinct)
+            return
+
+        counter = kmer_numpy.count_range if self._numpy else count_range # type: ignore
+        merger = kmer_numpy.merge_runs if self._numpy else merge_runs # type: ignore
+
+        if memory_limit is not None:
+            # Packing temporaries (measured), or raw keys as Python int objects
+            per_kmer = kmer_numpy.PACK_BYTES_PER_BASE if self._numpy else 48 # type: ignore
+            self._insert_runs(*count_external(infile, self._k, self._canonical,
+                                              memory_limit, counter, merger,
+                                              per_kmer, tmpdir=tmpdir))
+            return
+
+        if kmer_input.is_gzip(infile) or kmer_input.detect(infile) != kmer_input.LINES:
+            sequences = kmer_numpy.count_sequences if self._numpy else count_sequences # type: ignore
+            self._insert_runs(*sequences(kmer_input.sequences(infile, self._k),
+                                         self._k, self._canonical))
+            return
+
+        if workers <= 1:
+            self._insert_runs(*counter(infile, 0, os.path.getsize(infile),
+                                       self._k, self._canonical))
+            return
+
+        ranges = kmer_input.split_lines(infile, workers)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(counter, infile, start, stop,
+                                   self._k, self._canonical)
+                       for start, stop in ranges]
+            runs = [future.result() for future in futures]
+
+        self._insert_runs(*merger(runs))
 
+    @instrumented("batch_insert", ingest=True)
     def batch_insert(self, kmers: list[str]) -> None:
         """
-        Given a list of m k-mers, delete the matching ones
+        Given a list of m k-mers, insert them into the structure
         (including all duplicates).
         [V2: Correction]
         If the data structure contains n elements, and the input kmer list
         contains m elements, the targeted time complexity is:
         O(m log m) + O(n + m) amortized time (or better, of course!)
         """
-        pass
+        packed = [self._encode(kmer) for kmer in kmers]
+
+        if self._prefilter is not None:
+            self._insert_filtered(lambda: iter(packed), len(packed))
+            return
+
+        if self._numpy:
+            self._insert_runs(*kmer_numpy.collapse(kmer_numpy.as_keys(packed))) # type: ignore
+            return
 
+        packed.sort()
+        self._insert_runs(*collapse(packed))
+
+    @instrumented("batch_delete")
     def batch_delete(self, kmers: list[str]) -> None:
         """
         Given a list of m k-mers, delete the matching ones
@@ -54,42 +660,487 @@ class KmerStore:
         If the data structure contains n elements, and the input kmer list
         contains m elements, the targeted time complexity is:
         O(m log m) + O(n + m) amortized time (or better, of course!)
- 
+
         """
-        pass
+        self._require_exact("batch_delete")
 
-    def freq_geq(self, m: int) -> list[str]:
+        packed = [self._encode(kmer) for kmer in kmers]
+
+        if self._numpy:
+            self._delete_keys(kmer_numpy.as_keys(packed)) # type: ignore
+            return
+
+        packed.sort()
+        self._delete_keys(collapse(packed)[0])
+
+    @instrumented("freq_geq")
+    def freq_geq(self, m: int) -> Iterator[str]:
         """
-        Given an integer m, return a list of k-mers that occur
+        Given an integer m, return the k-mers that occur
         >= m times in your data structure.
+        The k-mers are produced lazily, in increasing order of count,
+        from the snapshot current at the time of the call.
         Time complexity for full marks: O(n)
+        Time complexity here: O(log n + output), plus an O(n log n)
+        rebuild of the count index on the first query after a mutation.
+        Approximate stores yield, in no particular order, the candidates
+        whose estimate is >= m. A k-mer is only missed if it was evicted
+        from the candidates, which cannot happen while m > the highest
+        evicted estimate.
         """
-        pass
+        if self._sketch is not None:
+            return self._decode_candidates(list(self._candidates), m)
+
+        return self._snapshot.freq_geq(m)
 
+    @instrumented("count")
     def count(self, kmer: str) -> int:
         """
         Given a k-mer, return the number of times it appears in
         your data structure.
         Time complexity for full marks: O(log n)
+        Approximate stores return an upper bound in O(depth).
         """
-        pass
+        if self._sketch is not None:
+            return self._sketch.estimate(self._encode(kmer))
 
+        return self._snapshot.count(kmer)
+
+    @instrumented("count_geq")
     def count_geq(self, kmer: str) -> int:
         """
         Given a k-mer, return the total number of k-mers that
         are lexicographically greater or equal.
         Time complexity for full marks: O(log n)
         """
-        pass
+        self._require_exact("count_geq")
+
+        return self._snapshot.count_geq(kmer)
 
+    @instrumented("compatible")
     def compatible(self, kmer: str) -> int:
         """
         Given a k-mer, return the total number of compatible
         k-mers. You will be using the two suffix characters
         of the input k-mer to compare against the first two
         characters of all other k-mers.
+        Two characters are compatible when they form a base pair
+        (A with T, C with G).
         Time complexity for full marks: O(1) :-)
         """
-        pass
+        if self._sketch is not None:
+            return self._approx_compatible(kmer)
+
+        return self._snapshot.compatible(kmer)
+
+    @instrumented("count_many")
+    def count_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return count(kmer) for each of m k-mers, in the same order.
+        The queries are sorted and answered by one galloping merge
+        against the keys.
+        Time complexity: O(m log m + min(n, m log n))
+        """
+        if self._sketch is not None:
+            return [self._sketch.estimate(self._encode(kmer)) for kmer in kmers]
+
+        return self._snapshot.count_many(kmers)
+
+    @instrumented("count_geq_many")
+    def count_geq_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return count_geq(kmer) for each of m k-mers, in the same order.
+        Time complexity: O(m log m + min(n, m log n))
+        """
+        self._require_exact("count_geq_many")
+
+        return self._snapshot.count_geq_many(kmers)
+
+    @instrumented("compatible_many")
+    def compatible_many(self, kmers: list[str]) -> list[int]:
+        """
+        Return compatible(kmer) for each of m k-mers, in the same order.
+        Time complexity: O(m)
+        """
+        if self._sketch is not None:
+            return [self._approx_compatible(kmer) for kmer in kmers]
+
+        return self._snapshot.compatible_many(kmers)
 
     # Any other functionality you may need
+
+    def get_size(self) -> int:
+        """
+        Return n, the number of distinct k-mers in the structure.
+        Approximate stores return the number of freq_geq candidates.
+        Time complexity: O(1)
+        """
+        if self._sketch is not None:
+            return len(self._candidates)
+
+        return self._snapshot.get_size()
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        """
+        Lazily yield every (k-mer, count) pair in lexicographic order,
+        from the snapshot current at the time of the call.
+        Time complexity: O(n)
+        """
+        self._require_exact("items")
+
+        return self._snapshot.items()
+
+    def freeze(self) -> None:
+        """
+        Publish the current generation again in compressed form: the
+        keys Elias-Fano coded (about 2 + log2(4^k / n) bits each), the
+        counts bit-packed at the width of the largest count, and the
+        count prefix sums sampled every kmer_frozen.PREFIX_SAMPLE keys.
+        Queries keep working on the frozen form; the next update
+        decompresses it.
+        Time complexity: O(n)
+        """
+        self._require_exact("freeze")
+
+        with self._write_lock:
+            snap = self._snapshot
+            if snap.is_frozen():
+                return
+            keys, counts, prefix = kmer_frozen.freeze(snap._keys, snap._counts, self._k)
+            self._snapshot = KmerSnapshot(snap.get_id() + 1, self._k, self._canonical, False,
+                                          keys, counts, prefix, [int(x) for x in snap._lead])
+
+    def snapshot(self) -> KmerSnapshot:
+        """
+        Return the current generation. It answers the same queries as
+        the store and never changes, whatever updates follow.
+        Time complexity: O(1)
+        """
+        return self._snapshot
+
+    def get_snapshot_id(self) -> int:
+        """
+        Return the number of the current generation.
+        Time complexity: O(1)
+        """
+        return self._snapshot.get_id()
+
+    def update_metrics(self) -> dict[str, float]:
+        """
+        Return the number of updates published so far and their last,
+        mean and maximum latency in seconds, measured from taking the
+        write lock to publishing the new snapshot.
+        """
+        return {
+            "updates": self._updates,
+            "last_seconds": self._update_last,
+            "mean_seconds": self._update_total / self._updates if self._updates else 0.0,
+            "max_seconds": self._update_max,
+        }
+
+    def enable_metrics(self, enabled: bool = True) -> None:
+        """
+        Start (or with @enabled@ False, stop) recording operation
+        metrics. Starting again discards what was recorded before.
+        """
+        self._metrics = OperationMetrics() if enabled else None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the recorded metrics: for each operation its calls, total
+        seconds and p50/p99 latency in seconds (freq_geq is timed up to
+        returning its generator), the k-mers ingested by read and
+        batch_insert and the rate they were ingested at, the update
+        latencies of update_metrics(), and the store's memory_summary()
+        total in bytes, overall and per stored k-mer.
+        Operation figures are empty unless metrics are enabled.
+        """
+        summary = self._metrics.summary() if self._metrics is not None else {
+            "operations": {}, "ingested": 0, "kmers_per_second": 0.0,
+        }
+
+        stored = len(self._candidates) if self._sketch is not None else self._snapshot.get_size()
+        used = memory_summary(self)["total_bytes"]
+
+        summary["enabled"] = self._metrics is not None
+        summary["updates"] = self.update_metrics()
+        summary["distinct"] = stored
+        summary["memory_bytes"] = used
+        summary["bytes_per_kmer"] = used / stored if stored else 0.0
+        return summary
+
+    @contextmanager
+    def profile(self, operation: str) -> Iterator[cProfile.Profile]:
+        """
+        Profile every call of @operation@ (a method name such as "read"
+        or "count") made inside the with block, and give back the
+        cProfile.Profile, ready for pstats once the block ends.
+        """
+        profiler = cProfile.Profile()
+        self._profilers[operation] = profiler
+
+        try:
+            yield profiler
+        finally:
+            del self._profilers[operation]
+
+    def save(self, path: str) -> None:
+        """
+        Write the structure to @path@ as a fixed-width index that
+        KmerStore.open can map straight back into memory.
+        Only k <= 32 is supported, so that every key fits in 64 bits.
+        Time complexity: O(n)
+        """
+        self._require_exact("save")
+        if self._k > 32:
+            raise ValueError(f"cannot save {self._k}-mers, the index holds at most 32-mers")
+
+        snap = self._snapshot
+        arrays = [self._as_array("Q", snap._keys), self._as_array("q", snap._counts),
+                  self._as_array("q", snap._prefix), self._as_array("q", snap._lead)]
+        flags = FLAG_CANONICAL if self._canonical else 0
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self._k, flags,
+                             len(snap._keys), int(snap._prefix[-1]), 0)
+        crc = zlib.crc32(header[:CHECKED_HEADER])
+
+        for values in arrays:
+            if sys.byteorder != "little":
+                values.byteswap()
+            crc = zlib.crc32(values, crc)
+
+        with open(path, "wb") as f:
+            f.write(header[:CHECKED_HEADER] + struct.pack("<I4x", crc))
+            for values in arrays:
+                values.tofile(f)
+
+    @classmethod
+    def open(cls, path: str, verify: bool = False) -> "KmerStore":
+        """
+        Map an index written by save() into a new store. The arrays are
+        read-only views of the mapping, so opening costs O(1) and the
+        pages are shared by every process that opens the same file.
+        The first mutation copies the arrays out of the mapping.
+        With @verify@, the header and arrays are also checked against
+        the stored CRC, an O(n) pass that touches every page.
+        Raises ValueError for a file that is not a valid index.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a KmerStore index")
+
+        magic, version, k, flags, n, total, crc = HEADER.unpack_from(buffer)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a KmerStore index")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported index version {version}")
+        if len(buffer) != HEADER.size + 8 * (3 * n + 17):
+            raise ValueError(f"{path} is truncated or has trailing data")
+
+        view = memoryview(buffer)[HEADER.size:]
+        if verify and zlib.crc32(view, zlib.crc32(buffer[:CHECKED_HEADER])) != crc:
+            raise ValueError(f"{path} failed checksum validation")
+
+        store = cls(k, canonical=bool(flags & FLAG_CANONICAL))
+        bounds = [0, n, 2 * n, 3 * n + 1, 3 * n + 17]
+        arrays: list[Sequence[int]] = []
+
+        for i, code in enumerate("Qqqq"):
+            raw = view[8 * bounds[i]:8 * bounds[i + 1]]
+            if store._numpy:
+                part = kmer_numpy.np.frombuffer(raw, dtype="<u8" if code == "Q" else "<i8") # type: ignore
+            else:
+                part = raw.cast(code)
+                # Big-endian hosts cannot use the mapping directly
+                if sys.byteorder != "little":
+                    part = array(code, part)
+                    part.byteswap()
+            arrays.append(part)
+
+        keys, counts, prefix, lead = arrays
+        if prefix[-1] != total:
+            raise ValueError(f"{path} has inconsistent totals")
+
+        store._snapshot = KmerSnapshot(0, k, store._canonical, store._numpy,
+                                       keys, counts, prefix, lead, buffer)
+        return store
+
+    def _as_array(self, code: str, values: Sequence[int]) -> array:
+        if self._numpy and hasattr(values, "tobytes"):
+            return array(code, values.tobytes()) # type: ignore
+        return array(code, values)
+
+    def _encode(self, kmer: str) -> int:
+        return encode(kmer, self._k, self._canonical)
+
+    def _total(self) -> int:
+        """
+        Return the number of k-mer occurrences held by the structure.
+        """
+        if self._sketch is not None:
+            return self._sketch.get_total()
+
+        return int(self._snapshot._prefix[-1])
+
+    def _require_exact(self, operation: str) -> None:
+        if self._sketch is not None:
+            raise ValueError(f"{operation} is not supported on approximate KmerStores")
+
+    def _approx_compatible(self, kmer: str) -> int:
+        if self._k < 2:
+            return 0
+        first = 3 - ENCODE[kmer[-2]]
+        second = 3 - ENCODE[kmer[-1]]
+        return self._lead[first * 4 + second]
+
+    def _make_snapshot(self, ident: int, keys: Sequence[int],
+                       counts: Sequence[int]) -> KmerSnapshot:
+        if self._numpy and isinstance(keys, list):
+            keys, counts = kmer_numpy.as_keys(keys), kmer_numpy.as_counts(counts) # type: ignore
+        return KmerSnapshot(ident, self._k, self._canonical, self._numpy, keys, counts)
+
+    def _publish(self, keys: Sequence[int], counts: Sequence[int], started: float) -> None:
+        """
+        Build the next generation from new key and count arrays and
+        make it current with a single reference swap. Must be called
+        holding the write lock, which was taken at time @started@.
+        """
+        self._snapshot = self._make_snapshot(self._snapshot.get_id() + 1, keys, counts)
+
+        elapsed = time.perf_counter() - started
+        self._updates += 1
+        self._update_last = elapsed
+        self._update_total += elapsed
+        self._update_max = max(self._update_max, elapsed)
+
+    def _decode_candidates(self, keys: list[int], m: int) -> Iterator[str]:
+        for key in keys:
+            if self._sketch.estimate(key) >= m: # type: ignore
+                yield decode(key, self._k)
+
+    def _add_estimate(self, key: int, count: int) -> None:
+        """
+        Add occurrences of a key to the sketch and the exact leading
+        pair table, and track it as a candidate if its estimate is high
+        enough. When the candidates overflow, the lower half by estimate
+        is evicted, for O(log capacity) amortized time per call.
+        """
+        self._sketch.add(key, count) # type: ignore
+        if self._k >= 2:
+            self._lead[key >> (2 * self._k - 4)] += count
+        estimate = self._sketch.estimate(key) # type: ignore
+
+        if estimate <= self._floor:
+            return
+
+        self._candidates[key] = estimate
+
+        if len(self._candidates) > self._capacity:
+            ranked = sorted(self._candidates.items(), key=lambda item: item[1])
+            cut = len(ranked) - self._capacity // 2
+            self._floor = max(self._floor, ranked[cut - 1][1])
+            self._candidates = dict(ranked[cut:])
+
+    def _insert_filtered(self, stream: Callable[[], Iterator[int]],
+                         expected: int) -> None:
+        """
+        Insert the keys of an input, taken twice from @stream@, skipping
+        keys that occur once in it and are not already stored.
+        The first pass admits a key when the Bloom filter has seen it
+        before; the second counts the admitted keys exactly.
+        Time complexity: O(m log n) for m keys in the input
+        """
+        bloom = BloomFilter(expected, self._prefilter) # type: ignore
+        admitted: dict[int, int] = {}
+        snap = self._snapshot
+
+        for key in stream():
+            if key in admitted:
+                continue
+            if bloom.contains(key) or snap._contains(key):
+                admitted[key] = 0
+            else:
+                bloom.add(key)
+
+        for key in stream():
+            if key in admitted:
+                admitted[key] += 1
+
+        # Keys seen once were only admitted through a false positive
+        keep = sorted(key for key, count in admitted.items()
+                      if count > 1 or snap._contains(key))
+        self._insert_runs(keep, [admitted[key] for key in keep])
+
+    def _insert_runs(self, keys: Sequence[int], counts: Sequence[int]) -> None:
+        """
+        Merge sorted, collapsed runs of keys into the structure.
+        Time complexity: O(n + m)
+        """
+        with self._write_lock:
+            started = time.perf_counter()
+
+            if self._sketch is not None:
+                for key, count in zip(keys, counts):
+                    self._add_estimate(key, count)
+                return
+
+            old_keys, old_counts = self._snapshot._arrays(self._numpy)
+
+            if self._numpy:
+                self._publish(*kmer_numpy.merge_runs([(old_keys, old_counts), (keys, counts)]), started) # type: ignore
+                return
+
+            new_keys: list[int] = []
+            new_counts: list[int] = []
+            i = j = 0
+
+            while i < len(old_keys) and j < len(keys):
+                if old_keys[i] < keys[j]:
+                    new_keys.append(old_keys[i])
+                    new_counts.append(old_counts[i])
+                    i += 1
+                elif old_keys[i] > keys[j]:
+                    new_keys.append(keys[j])
+                    new_counts.append(counts[j])
+                    j += 1
+                else:
+                    new_keys.append(keys[j])
+                    new_counts.append(old_counts[i] + counts[j])
+                    i += 1
+                    j += 1
+
+            new_keys.extend(old_keys[i:])
+            new_counts.extend(old_counts[i:])
+            new_keys.extend(keys[j:])
+            new_counts.extend(counts[j:])
+
+            self._publish(new_keys, new_counts, started)
+
+    def _delete_keys(self, keys: Sequence[int]) -> None:
+        """
+        Remove every sorted, distinct key in keys from the structure.
+        Time complexity: O(n + m)
+        """
+        with self._write_lock:
+            started = time.perf_counter()
+            old_keys, old_counts = self._snapshot._arrays(self._numpy)
+
+            if self._numpy:
+                self._publish(*kmer_numpy.delete_keys(old_keys, old_counts, keys), started) # type: ignore
+                return
+
+            new_keys: list[int] = []
+            new_counts: list[int] = []
+            j = 0
+
+            for i, key in enumerate(old_keys):
+                while j < len(keys) and keys[j] < key:
+                    j += 1
+                if j < len(keys) and keys[j] == key:
+                    continue
+                new_keys.append(key)
+                new_counts.append(old_counts[i])
+
+            self._publish(new_keys, new_counts, started)
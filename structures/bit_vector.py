@@ -4,9 +4,11 @@ The University of Queensland
 Joel Mackenzie and Vladimir Morozov
 """
 
+from bisect import bisect_right
 from typing import Any
 
 from structures.dynamic_array import DynamicArray
+from structures.memory import object_bytes
 
 
 class BitVector:
@@ -17,6 +19,7 @@ class BitVector:
     """
 
     BITS_PER_ELEMENT = 64
+    SELECT_BLOCK = 8    # Words per block of the select directory
 
     def __init__(self) -> None:
         """
@@ -26,6 +29,8 @@ class BitVector:
         self._offset : int = 16
         self._reverse: bool = False
         self._data: DynamicArray = DynamicArray()
+        # Select directory, built on demand and dropped on every change
+        self._select: tuple[list[int], list[int]] | None = None
 
     def __str__(self) -> str:
         """
@@ -42,17 +47,9 @@ class BitVector:
         """
         if not 0 <= index < self._size:
             return
-        
-        if self._reverse:
-            bit_index = self._size - 1 + self._offset - index
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            bit = elem & (1 << (self.BITS_PER_ELEMENT - 1 - (bit_index % self.BITS_PER_ELEMENT))) # type: ignore
-        else:
-            bit_index = index + self._offset
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            bit = elem & (1 << (bit_index % self.BITS_PER_ELEMENT)) # type: ignore
-        
-        return 1 if bit else 0
+
+        word, bit = self.__locate(index)
+        return (self._data[word] >> bit) & 1 # type: ignore
 
     def __getitem__(self, index: int) -> int | None:
         """
@@ -70,16 +67,9 @@ class BitVector:
         if not 0 <= index < self._size:
             return
 
-        if self._reverse:
-            bit_index = self._size - 1 + self._offset - index
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            mask = elem | (1 << (self.BITS_PER_ELEMENT - 1 - (bit_index % self.BITS_PER_ELEMENT))) # type: ignore
-            self._data[bit_index // self.BITS_PER_ELEMENT] = mask
-        else:
-            bit_index = index + self._offset
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            mask = elem | (1 << (bit_index % self.BITS_PER_ELEMENT)) # type: ignore
-            self._data[bit_index // self.BITS_PER_ELEMENT] = mask
+        word, bit = self.__locate(index)
+        self._data[word] = self._data[word] | (1 << bit) # type: ignore
+        self._select = None
 
     def unset_at(self, index: int) -> None:
         """
@@ -90,16 +80,17 @@ class BitVector:
         if not 0 <= index < self._size:
             return
 
+        word, bit = self.__locate(index)
+        self._data[word] = self._data[word] & ~(1 << bit) # type: ignore
+        self._select = None
+
+    def __locate(self, index: int) -> tuple[int, int]:
+        # Map a logical index to its word and bit in the (never
+        # reversed) storage; reversal just mirrors the logical index
         if self._reverse:
-            bit_index = self._size - 1 + self._offset - index
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            mask = elem & ~(1 << (self.BITS_PER_ELEMENT - 1 - (bit_index % self.BITS_PER_ELEMENT))) # type: ignore
-            self._data[bit_index // self.BITS_PER_ELEMENT] = mask
-        else:
-            bit_index = index + self._offset
-            elem = self._data[bit_index // self.BITS_PER_ELEMENT]
-            mask = elem & ~(1 << (bit_index % self.BITS_PER_ELEMENT)) # type: ignore
-            self._data[bit_index // self.BITS_PER_ELEMENT] = mask
+            index = self._size - 1 - index
+        bit_index = index + self._offset
+        return bit_index // self.BITS_PER_ELEMENT, bit_index % self.BITS_PER_ELEMENT
 
     def __setitem__(self, index: int, state: int) -> None:
         """
@@ -132,25 +123,58 @@ class BitVector:
         """
         self.__pend(True if not self._reverse else False, state)
 
+    def extend(self, count: int, state: int) -> None:
+        """
+        Add @count@ copies of a bit to the back of the vector.
+        Whole words are appended at once, so this is much cheaper than
+        calling append @count@ times.
+        Time complexity: O(count / 64) amortized
+        """
+        if self._reverse:
+            for _ in range(count):
+                self.append(state)
+            return
+
+        word = (1 << self.BITS_PER_ELEMENT) - 1 if state else 0
+        self._select = None
+
+        # Fill the last partial word, then whole words, then the tail
+        while count > 0 and (self._offset + self._size) % self.BITS_PER_ELEMENT:
+            self.append(state)
+            count -= 1
+
+        while count >= self.BITS_PER_ELEMENT:
+            self._data.append(word)
+            self._size += self.BITS_PER_ELEMENT
+            count -= self.BITS_PER_ELEMENT
+
+        for _ in range(count):
+            self.append(state)
+
     def __pend(self, front: bool, state: int) -> None:
+        self._select = None
+        # Positions are physical here: front is storage bit _offset - 1,
+        # back is storage bit _offset + _size
         if front:
             if self._offset == 0:
-                self._offset = self.BITS_PER_ELEMENT - 1
-                self._data.prepend(int(state << self._offset))
-            else:
-                self._offset -= 1
-                if state:
-                    self.set_at(0)
-                else:
-                    self.unset_at(0)
+                self._data.prepend(0)
+                self._offset = self.BITS_PER_ELEMENT
+            self._offset -= 1
+            bit_index = self._offset
         else:
-            if (self._offset + self._size) % self.BITS_PER_ELEMENT == 0:
-                self._data.append(state)
-            else:
-                if state:
-                    self.set_at(self._offset + self._size)
-                else:
-                    self.unset_at(self._offset + self._size)
+            bit_index = self._offset + self._size
+
+        # Storage starts empty, so the first bit may need its word
+        while bit_index // self.BITS_PER_ELEMENT >= self._data.get_size():
+            self._data.append(0)
+
+        word = bit_index // self.BITS_PER_ELEMENT
+        mask = 1 << (bit_index % self.BITS_PER_ELEMENT)
+
+        if state:
+            self._data[word] = self._data[word] | mask # type: ignore
+        else:
+            self._data[word] = self._data[word] & ~mask # type: ignore
 
         self._size += 1
 
@@ -159,9 +183,7 @@ class BitVector:
         Reverse the bit-vector.
         Time complexity for full marks: O(1)
         """
-        self._data.reverse()
         self._reverse = not self._reverse
-        assert self._reverse is self._data._reverse
 
     def flip_all_bits(self) -> None:
         """
@@ -186,6 +208,101 @@ class BitVector:
         Time complexity for full marks: O(N)
         """
 
+    def memory_usage(self, deep: bool = False) -> dict[str, int]:
+        """
+        Report the memory held by the vector, in bytes unless named
+        otherwise. The buffer is the word array and the int objects
+        holding the words; the payload is the bits themselves, which
+        live inside the buffer, so @deep@ changes nothing. The slot
+        overhead is what each word costs beyond its 8 bytes of bits.
+        Time complexity: O(N / 64)
+        """
+        array = self._data.memory_usage(deep=True)
+        words = self._data.get_size()
+        buffer = array["buffer_bytes"] + array["payload_bytes"]
+        usage = {
+            "object_bytes": object_bytes(self) + array["object_bytes"],
+            "buffer_bytes": buffer,
+            "slot_overhead_bytes": buffer // words - self.BITS_PER_ELEMENT // 8 if words else 0,
+            "unused_slots": array["unused_slots"],
+            "unused_bits": words * self.BITS_PER_ELEMENT - self._size,
+            "payload_bytes": (self._size + 7) // 8,
+        }
+        usage["total_bytes"] = usage["object_bytes"] + buffer
+        return usage
+
+    def select(self, rank: int, state: int = 1) -> int | None:
+        """
+        Return the index of the bit that is the @rank@-th (counting from
+        0) to equal @state@, or None if there are not that many.
+        The first call after a change builds a directory holding the
+        number of set bits before every SELECT_BLOCK words. A query then
+        binary searches the directory and scans at most SELECT_BLOCK
+        words.
+        Time complexity: O(log N) after an O(N / 64) build
+        """
+        if self._select is None:
+            self._select = self.__build_select()
+
+        ones = self._select[0][-1]
+        total = ones if state else self._size - ones
+        if not 0 <= rank < total:
+            return None
+
+        # Storage order is the reverse of a reversed vector's order
+        if self._reverse:
+            return self._size - 1 - self.__select_stored(total - 1 - rank, state)
+        return self.__select_stored(rank, state)
+
+    def __chunk(self, j: int) -> int:
+        # Bits [64 j, 64 j + 64) in storage order, zero past the end
+        bits = self.BITS_PER_ELEMENT
+        word, shift = divmod(self._offset + j * bits, bits)
+        value = self._data[word] >> shift # type: ignore
+        if shift and word + 1 < self._data.get_size():
+            value |= self._data[word + 1] << (bits - shift) # type: ignore
+        valid = min(bits, self._size - j * bits)
+        return value & ((1 << valid) - 1)
+
+    def __build_select(self) -> tuple[list[int], list[int]]:
+        bits = self.BITS_PER_ELEMENT
+        chunks = (self._size + bits - 1) // bits
+        ones: list[int] = []
+        zeros: list[int] = []
+        count = 0
+
+        for j in range(chunks):
+            if j % self.SELECT_BLOCK == 0:
+                ones.append(count)
+                zeros.append(j * bits - count)
+            count += self.__chunk(j).bit_count()
+
+        ones.append(count)
+        zeros.append(self._size - count)
+        return ones, zeros
+
+    def __select_stored(self, rank: int, state: int) -> int:
+        bits = self.BITS_PER_ELEMENT
+        before = self._select[0 if state else 1] # type: ignore
+        block = bisect_right(before, rank) - 1
+        rank -= before[block]
+        j = block * self.SELECT_BLOCK
+
+        while True:
+            value = self.__chunk(j)
+            if not state:
+                value ^= (1 << min(bits, self._size - j * bits)) - 1
+            count = value.bit_count()
+            if rank < count:
+                break
+            rank -= count
+            j += 1
+
+        # Drop the lowest set bits until the wanted one is lowest
+        for _ in range(rank):
+            value &= value - 1
+        return j * bits + (value & -value).bit_length() - 1
+
     def get_size(self) -> int:
         """
         Return the number of *bits* in the list
@@ -0,0 +1,67 @@
+"""
+A Bloom filter over integer keys, stored in a BitVector.
+"""
+
+import math
+
+from structures.bit_vector import BitVector
+from structures.hashing import FIBONACCI, MIXER, OFFSETS, PRIME
+
+
+class BloomFilter:
+    """
+    Approximate set membership: contains() never misses a key that was
+    added, but may report a key that was not, with a probability close
+    to @fp_rate@ once @expected@ keys have been added.
+    The bit positions of a key come from double hashing, h1 + i * h2.
+    """
+
+    def __init__(self, expected: int, fp_rate: float) -> None:
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+
+        expected = max(expected, 1)
+        bits = math.ceil(-expected * math.log(fp_rate) / math.log(2) ** 2)
+
+        self._size: int = max(bits, 64)
+        self._hashes: int = max(1, round(self._size / expected * math.log(2)))
+        self._bits: BitVector = BitVector()
+        self._bits.extend(self._size, 0)
+
+    def __positions(self, key: int) -> range:
+        h1 = (FIBONACCI * key + OFFSETS[0]) % PRIME
+        h2 = (MIXER * key + OFFSETS[1]) % PRIME | 1
+        return range(h1, h1 + self._hashes * h2, h2)
+
+    def add(self, key: int) -> None:
+        """
+        Add a key to the filter.
+        Time complexity: O(number of hashes)
+        """
+        for position in self.__positions(key):
+            self._bits.set_at(position % self._size)
+
+    def contains(self, key: int) -> bool:
+        """
+        Return True if the key may have been added, False if it
+        definitely was not.
+        Time complexity: O(number of hashes)
+        """
+        for position in self.__positions(key):
+            if not self._bits.get_at(position % self._size):
+                return False
+        return True
+
+    def __contains__(self, key: int) -> bool:
+        """
+        Same as contains.
+        Allows to use the `in` operator.
+        """
+        return self.contains(key)
+
+    def get_size(self) -> int:
+        """
+        Return the number of bits in the filter.
+        Time complexity: O(1)
+        """
+        return self._size
@@ -4,7 +4,10 @@ The University of Queensland
 Joel Mackenzie and Vladimir Morozov
 """
 
-from typing import Any, List
+import sys
+from typing import Any, Iterator, List
+
+from structures.memory import object_bytes, payload_bytes
 
 
 class DynamicArray:
@@ -14,6 +17,9 @@ class DynamicArray:
         self._capacity: int = 64
         self._reverse: bool = False
         self._data: List = [None] * self._capacity
+        # True while _data may be referenced by a view or snapshot, in
+        # which case the next write copies it first
+        self._shared: bool = False
 
     def __str__(self) -> str:
         """
@@ -51,6 +57,9 @@ class DynamicArray:
         """
         if not 0 <= index < self._size:
             return
+
+        if self._shared:
+            self.__unshare()
         
         if self._reverse:
             self._data[self._size - index - 1 + self._offset] = element
@@ -81,6 +90,8 @@ class DynamicArray:
         self.__pend(True if not self._reverse else False, element)
 
     def __pend(self, front: bool, element: Any) -> None:
+        if self._shared:
+            self.__unshare()
         # Increase capacity left of array
         if self._offset == 0:
             new_offset: int = self._capacity
@@ -125,24 +136,11 @@ class DynamicArray:
         If there is no such element, leave the array unchanged.
         Time complexity for full marks: O(N)
         """
-        index = None
-        # Loop data from right to left
-        if self._reverse:
-            for i in range(self._size - 1 - self._offset, self._offset - 1, -1):
-                if self._data[i] == element:
-                    index = i
-                    break
-        # Loop data from left to right
-        else:
-            for i in range(self._offset, self._offset + self._size):
-                if self._data[i] == element:
-                    index = i
-                    break
-        # No index if no match
-        if index is None:
-            return
-        # Smart remove that index match
-        self.remove_at(index)
+        # Find the logical index of the first match
+        for index in range(self._size):
+            if self.get_at(index) == element:
+                self.remove_at(index)
+                return
                     
     def remove_at(self, index: int) -> Any | None:
         """
@@ -152,12 +150,15 @@ class DynamicArray:
         """
         if not 0 <= index < self._size:
             return
+        if self._shared:
+            self.__unshare()
         # Collapse array on the left of element to the right
         if self._reverse:
+            position = self._size - 1 - index + self._offset
             # Save removed data first
-            data = self._data[self._size - 1 + index + self._offset]
+            data = self._data[position]
             # Begin looping to the left of index
-            for i in range(self._size - 1 - index + self._offset, self._offset + 1, -1):
+            for i in range(position, self._offset, -1):
                 self._data[i] = self._data[i - 1]
             # Clean first element and increment offset
             self._data[self._offset] = None
@@ -170,11 +171,47 @@ class DynamicArray:
             for i in range(index + self._offset, self._size - 1 + self._offset):
                 self._data[i] = self._data[i + 1]
             # Clean last element
-            self._data[self._size - 1] = None
+            self._data[self._size - 1 + self._offset] = None
         # Decrement size counter and return removed data
         self._size -= 1
         return data
 
+    def view(self, start: int, stop: int) -> "DynamicArrayView":
+        """
+        Return a read-only view of the elements at indices [start, stop),
+        clamped to the array like a slice, in the array's current order.
+        The view reads the array's buffer in place; the array copies the
+        buffer before its next write, so the view keeps showing the
+        elements as they were when it was made.
+        Time complexity: O(1)
+        """
+        start = min(max(start, 0), self._size)
+        stop = min(max(stop, start), self._size)
+        self._shared = True
+
+        if self._reverse:
+            return DynamicArrayView(self._data, self._offset + self._size - 1 - start, -1, stop - start)
+        return DynamicArrayView(self._data, self._offset + start, 1, stop - start)
+
+    def snapshot(self) -> "DynamicArray":
+        """
+        Return a copy of the array that shares its buffer until either
+        of them is written to, at which point the writer copies it.
+        Time complexity: O(1), plus O(N) on the first write afterwards
+        """
+        copy = DynamicArray()
+        copy._size = self._size
+        copy._offset = self._offset
+        copy._capacity = self._capacity
+        copy._reverse = self._reverse
+        copy._data = self._data
+        copy._shared = self._shared = True
+        return copy
+
+    def __unshare(self) -> None:
+        self._data = self._data[:]
+        self._shared = False
+
     def is_empty(self) -> bool:
         """
         Boolean helper to tell us if the structure is empty or not
@@ -203,6 +240,26 @@ class DynamicArray:
         """
         return self._capacity
 
+    def memory_usage(self, deep: bool = False) -> dict[str, int]:
+        """
+        Report the memory held by the array, in bytes unless named
+        otherwise: the array object itself, the slot buffer, the pointer
+        overhead of each slot, the unused slots, and (with @deep@) the
+        distinct elements stored, which are also added to the total.
+        Time complexity: O(1), or O(N) with @deep@
+        """
+        buffer = sys.getsizeof(self._data)
+        payload = payload_bytes(self._data[self._offset:self._offset + self._size]) if deep else 0
+        usage = {
+            "object_bytes": object_bytes(self),
+            "buffer_bytes": buffer,
+            "slot_overhead_bytes": (buffer - sys.getsizeof([])) // max(self._capacity, 1),
+            "unused_slots": self._capacity - self._size,
+            "payload_bytes": payload,
+        }
+        usage["total_bytes"] = usage["object_bytes"] + buffer + payload
+        return usage
+
     def sort(self) -> None:
         """
         Sort elements inside _data based on < comparisons.
@@ -234,3 +291,57 @@ class DynamicArray:
         self.__split(right, right_size)
 
         
+
+
+class DynamicArrayView:
+    """
+    A read-only window onto a DynamicArray's buffer, made by
+    DynamicArray.view(). Element i of the view is buffer slot
+    @base@ + i * @step@, with a step of -1 for a reversed array.
+    """
+
+    def __init__(self, data: List, base: int, step: int, size: int) -> None:
+        self._data: List = data
+        self._base: int = base
+        self._step: int = step
+        self._size: int = size
+
+    def get_at(self, index: int) -> Any | None:
+        """
+        Get element at the given index.
+        Return None if index is out of bounds.
+        Time complexity: O(1)
+        """
+        if not 0 <= index < self._size:
+            return
+        return self._data[self._base + index * self._step]
+
+    def __getitem__(self, index: int) -> Any | None:
+        """
+        Same as get_at.
+        Allows to use square brackets to index elements.
+        """
+        return self.get_at(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yield the elements in order, without copying them out first.
+        """
+        for position in range(self._base, self._base + self._size * self._step, self._step):
+            yield self._data[position]
+
+    def view(self, start: int, stop: int) -> "DynamicArrayView":
+        """
+        Return a view of indices [start, stop) of this view.
+        Time complexity: O(1)
+        """
+        start = min(max(start, 0), self._size)
+        stop = min(max(stop, start), self._size)
+        return DynamicArrayView(self._data, self._base + start * self._step, self._step, stop - start)
+
+    def get_size(self) -> int:
+        """
+        Return the number of elements in the view.
+        Time complexity: O(1)
+        """
+        return self._size
@@ -0,0 +1,110 @@
+"""
+Elias-Fano coding of a sorted sequence of non-negative integers.
+"""
+
+from bisect import bisect_left
+from typing import Iterable, Iterator
+
+from structures.bit_vector import BitVector
+from structures.packed_array import PackedArray
+
+
+class EliasFano:
+    """
+    An immutable, compressed, sorted sequence of n integers below
+    @universe@, in about 2 + log2(universe / n) bits each.
+    Each value is split into its low l = floor(log2(universe / n)) bits,
+    kept in a PackedArray, and its high bits, kept in unary in a
+    BitVector: value i sets bit (value >> l) + i, so the high part of
+    value i is select(i, 1) - i, and the number of values whose high
+    part is below h is select(h - 1, 0) - (h - 1).
+    """
+
+    def __init__(self, values: Iterable[int], universe: int | None = None) -> None:
+        values = values if isinstance(values, list) else list(values)
+        size = len(values)
+        if universe is None:
+            universe = values[-1] + 1 if values else 1
+
+        self._size: int = size
+        self._low_bits: int = max(0, (universe // max(size, 1)).bit_length() - 1)
+        self._low_mask: int = (1 << self._low_bits) - 1
+        self._top: int = (values[-1] >> self._low_bits) if values else 0
+        self._low: PackedArray = PackedArray((value & self._low_mask for value in values),
+                                             self._low_bits)
+
+        # One 1 per value and one 0 closing each high bucket up to _top
+        self._high: BitVector = BitVector()
+        self._high.extend(size + self._top + 1, 0)
+        for i, value in enumerate(values):
+            self._high.set_at((value >> self._low_bits) + i)
+
+    def get_at(self, index: int) -> int | None:
+        """
+        Get the value at the given index.
+        Return None if index is out of bounds.
+        Time complexity: O(log n)
+        """
+        if not 0 <= index < self._size:
+            return None
+        high = self._high.select(index) - index # type: ignore
+        return (high << self._low_bits) | self._low.get_at(index) # type: ignore
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Same as get_at, but negative indices count from the end and an
+        out of bounds index raises IndexError, as for a sequence.
+        """
+        if index < 0:
+            index += self._size
+        value = self.get_at(index)
+        if value is None:
+            raise IndexError("EliasFano index out of range")
+        return value
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yield the values in order, walking the high bits once.
+        Time complexity: O(n + universe / 2^l) overall
+        """
+        lows = iter(self._low)
+        high = 0
+        position = 0
+        for _ in range(self._size):
+            while not self._high.get_at(position):
+                high += 1
+                position += 1
+            position += 1
+            yield (high << self._low_bits) | next(lows)
+
+    def find(self, value: int) -> int:
+        """
+        Return the index of the first stored value >= @value@, or n if
+        there is none. Two selects bound the bucket of values sharing
+        its high bits, which a binary search over the low bits finishes.
+        Time complexity: O(log n)
+        """
+        high = value >> self._low_bits
+        if high > self._top:
+            return self._size
+
+        start = self._high.select(high - 1, 0) - (high - 1) if high else 0 # type: ignore
+        stop = self._high.select(high, 0) - high # type: ignore
+        return bisect_left(self._low, value & self._low_mask, start, stop)
+
+    def get_size(self) -> int:
+        """
+        Return the number of values.
+        Time complexity: O(1)
+        """
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The bytes held by the low bits and the high bit vector.
+        """
+        return self._low.nbytes + self._high.memory_usage()["total_bytes"]
@@ -0,0 +1,11 @@
+"""
+Constants shared by the hash functions of the structures and of the
+code built on them, defined once so the copies cannot drift apart.
+"""
+
+MASK64 = (1 << 64) - 1
+FIBONACCI = 0x9E3779B97F4A7C15      # 2^64 / golden ratio, for multiplicative hashing
+MIXER = 0xC2B2AE3D27D4EB4F          # xxHash's second 64-bit prime, a multiplier independent of FIBONACCI
+# Offsets added to the FIBONACCI and MIXER products when two base hashes are needed
+OFFSETS = (0x632BE59BD9B4E019, 0x165667B19E3779F9)
+PRIME = (1 << 89) - 1               # Mersenne prime above every 64-bit key, for modular hashing
@@ -0,0 +1,253 @@
+"""
+Open-addressing hash containers for integer keys: a set and a counter.
+"""
+
+from typing import Iterable, Iterator
+
+from structures.dynamic_array import DynamicArray
+from structures.hashing import FIBONACCI, MASK64
+
+
+class IntSet:
+    """
+    A set of integers in one flat DynamicArray of 2^b slots, an empty
+    slot holding None. A key lives at its hashed home slot or in the
+    run of occupied slots after it (linear probing). Removal shifts the
+    rest of the run back instead of leaving tombstones, so lookups never
+    probe past a deleted key. The table doubles once it is more than
+    @load_factor@ full.
+    """
+
+    MIN_BITS = 4
+
+    def __init__(self, keys: Iterable[int] = (), load_factor: float = 0.5) -> None:
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1")
+
+        self._load_factor: float = load_factor
+        self._size: int = 0
+        self._bits: int = self.MIN_BITS
+        self._keys: DynamicArray = self._empty_slots(1 << self._bits)
+        self.update(keys)
+
+    def add(self, key: int) -> bool:
+        """
+        Add a key. Return True if it was not already present.
+        Time complexity: O(1) expected, amortized
+        """
+        slot = self._probe(key)
+        if self._keys[slot] is not None:
+            return False
+
+        self._keys[slot] = key
+        self._grown()
+        return True
+
+    def update(self, keys: Iterable[int]) -> None:
+        """
+        Add every key in @keys@.
+        Time complexity: O(m) expected for m keys
+        """
+        for key in keys:
+            self.add(key)
+
+    def contains(self, key: int) -> bool:
+        """
+        Return True if the key is present.
+        Time complexity: O(1) expected
+        """
+        return self._keys[self._probe(key)] is not None
+
+    def __contains__(self, key: int) -> bool:
+        """
+        Same as contains.
+        Allows to use the `in` operator.
+        """
+        return self.contains(key)
+
+    def remove(self, key: int) -> bool:
+        """
+        Remove a key. Return True if it was present.
+        Time complexity: O(1) expected
+        """
+        slot = self._probe(key)
+        if self._keys[slot] is None:
+            return False
+
+        self._delete(slot)
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yield the keys, in no particular order.
+        """
+        for slot in range(1 << self._bits):
+            key = self._keys[slot]
+            if key is not None:
+                yield key
+
+    def get_size(self) -> int:
+        """
+        Return the number of keys.
+        Time complexity: O(1)
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return the number of slots.
+        Time complexity: O(1)
+        """
+        return 1 << self._bits
+
+    def _home(self, key: int) -> int:
+        return ((hash(key) * FIBONACCI) & MASK64) >> (64 - self._bits)
+
+    def _probe(self, key: int) -> int:
+        """
+        Return the slot holding @key@, or the empty slot ending its run.
+        """
+        mask = (1 << self._bits) - 1
+        slot = self._home(key)
+        while True:
+            current = self._keys[slot]
+            if current is None or current == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _delete(self, slot: int) -> None:
+        """
+        Empty @slot@ and shift back the keys after it that would
+        otherwise be cut off from their home slot.
+        """
+        mask = (1 << self._bits) - 1
+        hole = slot
+        slot = (slot + 1) & mask
+
+        while self._keys[slot] is not None:
+            home = self._home(self._keys[slot]) # type: ignore
+            # Movable unless its home lies cyclically in (hole, slot]
+            if (slot - home) & mask >= (slot - hole) & mask:
+                self._move(slot, hole)
+                hole = slot
+            slot = (slot + 1) & mask
+
+        self._clear(hole)
+        self._size -= 1
+
+    def _move(self, source: int, target: int) -> None:
+        self._keys[target] = self._keys[source]
+
+    def _clear(self, slot: int) -> None:
+        self._keys[slot] = None
+
+    def _grown(self) -> None:
+        """
+        Count a new key, doubling the table if it is now too full.
+        """
+        self._size += 1
+        if self._size > self._load_factor * (1 << self._bits):
+            self._resize(self._bits + 1)
+
+    def _resize(self, bits: int) -> None:
+        old = self._keys
+        capacity = 1 << self._bits
+        self._bits = bits
+        self._keys = self._empty_slots(1 << bits)
+        for slot in range(capacity):
+            key = old[slot]
+            if key is not None:
+                self._keys[self._probe(key)] = key
+
+    @staticmethod
+    def _empty_slots(capacity: int) -> DynamicArray:
+        slots = DynamicArray()
+        for _ in range(capacity):
+            slots.append(None)
+        return slots
+
+
+class IntCounter(IntSet):
+    """
+    A multiset of integers: an IntSet with a count per key, held in a
+    parallel DynamicArray of slots so no (key, count) pairs are stored.
+    """
+
+    def __init__(self, keys: Iterable[int] = (), load_factor: float = 0.5) -> None:
+        self._counts: DynamicArray = self._empty_slots(1 << self.MIN_BITS)
+        super().__init__(keys, load_factor)
+
+    def add(self, key: int, count: int = 1) -> int: # type: ignore[override]
+        """
+        Add @count@ occurrences of a key. Return its new count.
+        Time complexity: O(1) expected, amortized
+        """
+        slot = self._probe(key)
+        if self._keys[slot] is not None:
+            total = self._counts[slot] + count # type: ignore
+            self._counts[slot] = total
+            return total
+
+        self._keys[slot] = key
+        self._counts[slot] = count
+        self._grown()
+        return count
+
+    def get(self, key: int) -> int:
+        """
+        Return the number of occurrences of a key, 0 if absent.
+        Time complexity: O(1) expected
+        """
+        slot = self._probe(key)
+        return self._counts[slot] if self._keys[slot] is not None else 0 # type: ignore
+
+    def __getitem__(self, key: int) -> int:
+        """
+        Same as get.
+        Allows to use square brackets to look up counts.
+        """
+        return self.get(key)
+
+    def remove(self, key: int) -> int: # type: ignore[override]
+        """
+        Remove a key with all its occurrences. Return how many there
+        were, 0 if it was absent.
+        Time complexity: O(1) expected
+        """
+        slot = self._probe(key)
+        if self._keys[slot] is None:
+            return 0
+
+        count = self._counts[slot]
+        self._delete(slot)
+        return count # type: ignore
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        """
+        Yield (key, count) pairs, in no particular order.
+        """
+        for slot in range(1 << self._bits):
+            key = self._keys[slot]
+            if key is not None:
+                yield key, self._counts[slot] # type: ignore
+
+    def _move(self, source: int, target: int) -> None:
+        self._keys[target] = self._keys[source]
+        self._counts[target] = self._counts[source]
+
+    def _clear(self, slot: int) -> None:
+        self._keys[slot] = None
+        self._counts[slot] = None
+
+    def _resize(self, bits: int) -> None:
+        old_keys, old_counts = self._keys, self._counts
+        capacity = 1 << self._bits
+        self._bits = bits
+        self._keys = self._empty_slots(1 << bits)
+        self._counts = self._empty_slots(1 << bits)
+        for slot in range(capacity):
+            key = old_keys[slot]
+            if key is not None:
+                target = self._probe(key)
+                self._keys[target] = key
+                self._counts[target] = old_counts[slot]
@@ -9,6 +9,8 @@ from __future__ import annotations
 
 from typing import Any
 
+from structures.memory import object_bytes, payload_bytes
+
 
 class Node:
     """
@@ -238,12 +240,12 @@ class DoublyLinkedList:
         # Do nothing for no match
         if node is None:
             return False
-        # Check pointer and remove head
+        # Check pointer and remove real head, whatever the direction
         if node is self._head:
-            self.remove_from_front()
-        # Check pointer and remove tail
+            self.__remove(True)
+        # Check pointer and remove real tail
         elif node is self._tail:
-            self.remove_from_back()
+            self.__remove(False)
         # Must be in the middle (>3)
         # Link left and right nodes together
         else:
@@ -251,6 +253,7 @@ class DoublyLinkedList:
             right = node.get_next()
             left.set_next(right) # type: ignore
             right.set_prev(left) # type: ignore
+            self._size -= 1
         # Node was removed
         return True
 
@@ -284,3 +287,30 @@ class DoublyLinkedList:
         Time complexity for full marks: O(1)
         """
         self._reverse = not self._reverse
+
+    def memory_usage(self, deep: bool = False) -> dict[str, int]:
+        """
+        Report the memory held by the list, in bytes: the list object
+        itself, the nodes (which are all overhead: one object and its
+        attribute dict each), the per-node overhead, the unused slots
+        (always 0), and (with @deep@) the distinct data stored, which
+        is also added to the total.
+        Time complexity: O(N)
+        """
+        nodes = []
+        node = self._head
+        for _ in range(self._size):
+            nodes.append(node)
+            node = node.get_next()
+
+        buffer = sum(object_bytes(node) for node in nodes)
+        payload = payload_bytes(node.get_data() for node in nodes) if deep else 0
+        usage = {
+            "object_bytes": object_bytes(self),
+            "buffer_bytes": buffer,
+            "slot_overhead_bytes": buffer // self._size if self._size else 0,
+            "unused_slots": 0,
+            "payload_bytes": payload,
+        }
+        usage["total_bytes"] = usage["object_bytes"] + buffer + payload
+        return usage
@@ -0,0 +1,79 @@
+"""
+Memory accounting for the structures, and for whole object graphs built
+from them (such as a KmerStore).
+
+Sizes come from sys.getsizeof, so they are CPython's own view of each
+object: a list counts its slot pointers but not what they point to, an
+int counts its digits, and a NumPy array counts its data only when it
+owns it.
+"""
+
+import gc
+import mmap
+import sys
+import types
+from typing import Any, Iterable
+
+# Objects that belong to the program rather than to a data structure
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.CodeType, types.FrameType)
+
+
+def object_bytes(obj: Any) -> int:
+    """
+    Return the bytes of an object and of its attribute dict, if any.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(vars(obj))
+    return size
+
+
+def payload_bytes(values: Iterable[Any]) -> int:
+    """
+    Return the bytes of the distinct objects in @values@, so an element
+    stored in many slots is counted once.
+    Time complexity: O(N)
+    """
+    seen: set[int] = set()
+    total = 0
+
+    for value in values:
+        if id(value) not in seen:
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+
+    return total
+
+
+def memory_summary(root: Any) -> dict[str, Any]:
+    """
+    Walk everything reachable from @root@ and return the total bytes,
+    the number of objects, and the bytes per type name, largest first.
+    Each object is counted once however many references reach it, the
+    bytes of a memory map are its mapped length, and classes, modules
+    and functions are not followed.
+    Time complexity: O(objects + references)
+    """
+    seen: set[int] = set()
+    by_type: dict[str, int] = {}
+    pending = [root]
+    total = 0
+
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        size = len(obj) if isinstance(obj, mmap.mmap) and not obj.closed else sys.getsizeof(obj)
+        name = type(obj).__name__
+        by_type[name] = by_type.get(name, 0) + size
+        total += size
+        pending.extend(gc.get_referents(obj))
+
+    return {
+        "total_bytes": total,
+        "objects": len(seen),
+        "by_type": dict(sorted(by_type.items(), key=lambda item: -item[1])),
+    }
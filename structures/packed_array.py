@@ -0,0 +1,116 @@
+"""
+A fixed-width bit-packed array of non-negative integers.
+"""
+
+from array import array
+from typing import Iterable, Iterator
+
+from structures.hashing import MASK64
+
+
+class PackedArray:
+    """
+    An immutable array of non-negative integers, each stored in exactly
+    @width@ bits of a run of 64-bit words, so n values take n * width
+    bits rather than 64 bits (or a whole int object) each. Values may
+    straddle two words.
+    The width defaults to the fewest bits that hold the largest value.
+    """
+
+    BITS_PER_WORD = 64
+
+    def __init__(self, values: Iterable[int], width: int | None = None) -> None:
+        values = values if isinstance(values, (list, array)) else list(values)
+        if width is None:
+            width = max(values, default=0).bit_length()
+        if not 0 <= width <= self.BITS_PER_WORD:
+            raise ValueError("width must be between 0 and 64 bits")
+
+        self._width: int = width
+        self._size: int = len(values)
+        self._mask: int = (1 << width) - 1
+        self._words: array = array("Q")
+
+        # Gather values into a small int and flush it a word at a time
+        pending = 0
+        filled = 0
+        for value in values:
+            pending |= (value & self._mask) << filled
+            filled += width
+            if filled >= self.BITS_PER_WORD:
+                self._words.append(pending & MASK64)
+                pending >>= self.BITS_PER_WORD
+                filled -= self.BITS_PER_WORD
+        if filled:
+            self._words.append(pending)
+
+    def get_at(self, index: int) -> int | None:
+        """
+        Get the value at the given index.
+        Return None if index is out of bounds.
+        Time complexity: O(1)
+        """
+        if not 0 <= index < self._size:
+            return None
+        if not self._width:
+            return 0
+
+        word, shift = divmod(index * self._width, self.BITS_PER_WORD)
+        value = self._words[word] >> shift
+        if shift + self._width > self.BITS_PER_WORD:
+            value |= self._words[word + 1] << (self.BITS_PER_WORD - shift)
+        return value & self._mask
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Same as get_at, but negative indices count from the end and an
+        out of bounds index raises IndexError, as for a sequence.
+        """
+        if index < 0:
+            index += self._size
+        value = self.get_at(index)
+        if value is None:
+            raise IndexError("PackedArray index out of range")
+        return value
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yield the values in order, unpacking each word once.
+        """
+        width = self._width
+        mask = self._mask
+        pending = 0
+        filled = 0
+        words = iter(self._words)
+
+        for _ in range(self._size):
+            if filled < width:
+                pending |= next(words) << filled
+                filled += self.BITS_PER_WORD
+            yield pending & mask
+            pending >>= width
+            filled -= width
+
+    def get_size(self) -> int:
+        """
+        Return the number of values.
+        Time complexity: O(1)
+        """
+        return self._size
+
+    def get_width(self) -> int:
+        """
+        Return the bits used per value.
+        Time complexity: O(1)
+        """
+        return self._width
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The bytes held by the packed words.
+        """
+        return len(self._words) * self._words.itemsize
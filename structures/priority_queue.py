@@ -0,0 +1,190 @@
+"""
+A binary min-heap priority queue stored in a DynamicArray.
+"""
+
+from typing import Any, Callable, Iterable, Iterator
+
+from structures.dynamic_array import DynamicArray
+
+
+class PriorityQueue:
+    """
+    A min-priority queue: pop() returns the item with the smallest key.
+    Items are kept in heap order in a DynamicArray, the children of slot
+    i being slots 2i + 1 and 2i + 2. With a @key@ function, the key of
+    an item is computed once when it enters and kept in a parallel
+    DynamicArray, so no (key, item) pairs are ever allocated; without
+    one, items are compared directly.
+    Sifting moves a hole down or up the heap and writes the item once,
+    rather than swapping at every level.
+    """
+
+    def __init__(self, items: Iterable[Any] = (),
+                 key: Callable[[Any], Any] | None = None) -> None:
+        self._key = key
+        self._items: DynamicArray = DynamicArray()
+        self._keys: DynamicArray = self._items
+        self.heapify(items)
+
+    def push(self, item: Any) -> None:
+        """
+        Add an item to the queue.
+        Time complexity: O(log N)
+        """
+        key = self._key(item) if self._key is not None else item
+        self._items.append(item)
+        if self._key is not None:
+            self._keys.append(key)
+        self.__sift_up(self._items.get_size() - 1, item, key)
+
+    def pop(self) -> Any | None:
+        """
+        Remove and return the item with the smallest key.
+        Return None if the queue is empty.
+        Time complexity: O(log N)
+        """
+        size = self._items.get_size()
+        if size == 0:
+            return None
+
+        top = self._items[0]
+        item = self._items.remove_at(size - 1)
+        key = self._keys.remove_at(size - 1) if self._key is not None else item
+        if size > 1:
+            self.__sift_down(0, item, key)
+        return top
+
+    def peek(self) -> Any | None:
+        """
+        Return the item with the smallest key without removing it.
+        Return None if the queue is empty.
+        Time complexity: O(1)
+        """
+        return self._items[0]
+
+    def pushpop(self, item: Any) -> Any:
+        """
+        Push an item and then pop the smallest, in a single sift.
+        If the item is no bigger than the smallest, it is returned and
+        the queue is left unchanged.
+        Time complexity: O(log N)
+        """
+        key = self._key(item) if self._key is not None else item
+        if self._items.is_empty() or not self._keys[0] < key:
+            return item
+
+        top = self._items[0]
+        self.__sift_down(0, item, key)
+        return top
+
+    def replace(self, item: Any) -> Any | None:
+        """
+        Pop the smallest item and then push @item@, in a single sift.
+        Return the popped item, or None if the queue was empty.
+        Time complexity: O(log N)
+        """
+        if self._items.is_empty():
+            self.push(item)
+            return None
+
+        top = self._items[0]
+        key = self._key(item) if self._key is not None else item
+        self.__sift_down(0, item, key)
+        return top
+
+    def heapify(self, items: Iterable[Any]) -> None:
+        """
+        Replace the contents of the queue with @items@, building the
+        heap bottom-up.
+        Time complexity: O(N)
+        """
+        self._items = DynamicArray()
+        self._keys = DynamicArray() if self._key is not None else self._items
+        for item in items:
+            self._items.append(item)
+            if self._key is not None:
+                self._keys.append(self._key(item))
+
+        for i in range(self._items.get_size() // 2 - 1, -1, -1):
+            self.__sift_down(i, self._items[i], self._keys[i])
+
+    def is_empty(self) -> bool:
+        """
+        Boolean helper to tell us if the structure is empty or not
+        Time complexity: O(1)
+        """
+        return self._items.is_empty()
+
+    def get_size(self) -> int:
+        """
+        Return the number of items in the queue.
+        Time complexity: O(1)
+        """
+        return self._items.get_size()
+
+    def __place(self, index: int, item: Any, key: Any) -> None:
+        self._items[index] = item
+        if self._key is not None:
+            self._keys[index] = key
+
+    def __sift_up(self, index: int, item: Any, key: Any) -> None:
+        keys = self._keys
+        while index > 0:
+            parent = (index - 1) >> 1
+            parent_key = keys[parent]
+            if not key < parent_key:
+                break
+            self.__place(index, self._items[parent], parent_key)
+            index = parent
+        self.__place(index, item, key)
+
+    def __sift_down(self, index: int, item: Any, key: Any) -> None:
+        keys = self._keys
+        size = self._items.get_size()
+        child = 2 * index + 1
+        while child < size:
+            child_key = keys[child]
+            if child + 1 < size and keys[child + 1] < child_key:
+                child += 1
+                child_key = keys[child]
+            if not child_key < key:
+                break
+            self.__place(index, self._items[child], child_key)
+            index = child
+            child = 2 * index + 1
+        self.__place(index, item, key)
+
+
+def merge_sorted(iterables: Iterable[Iterable[Any]],
+                 key: Callable[[Any], Any] | None = None) -> Iterator[Any]:
+    """
+    Lazily merge iterables that are each sorted by @key@ into one sorted
+    stream. The queue holds the index of each unfinished iterable, keyed
+    by that iterable's current head, and replace() advances one iterable
+    per item. Equal items from different iterables come out in no
+    particular order.
+    Time complexity: O(log k) per item over k iterables
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    heads: list[Any] = [None] * len(iterators)
+
+    if key is None:
+        queue = PriorityQueue(key=heads.__getitem__)
+    else:
+        queue = PriorityQueue(key=lambda i: key(heads[i]))
+
+    for i, iterator in enumerate(iterators):
+        for head in iterator:
+            heads[i] = head
+            queue.push(i)
+            break
+
+    while not queue.is_empty():
+        i = queue.peek()
+        yield heads[i]
+        for head in iterators[i]:
+            heads[i] = head
+            queue.replace(i)
+            break
+        else:
+            queue.pop()
@@ -12,9 +12,40 @@ import random
 import sys
 import time
 import argparse
+import gzip
+import os
+import tempfile
+import threading
+import tracemalloc
+import math
+import io
+from collections import Counter
+
+from malloclabs import kmer_external, kmer_input
+from malloclabs.generate_dna import SHARD_SIZE, Workload, generate
+from malloclabs.kmer_external import count_external
+from malloclabs.kmer_structure import KmerStore, count_range, decode, merge_runs
+from structures.memory import memory_summary
+
+
+def random_kmers(k: int, n: int) -> list[str]:
+    """
+    Draw @n@ uniformly random k-mers of length @k@.
+    """
+    return ["".join(random.choice("ACGT") for _ in range(k)) for _ in range(n)]
+
+
+def reference_counts(kmers: list[str], canonical: bool = False) -> Counter:
+    """
+    Brute force k-mer counts to check a store against. With @canonical@,
+    each k-mer is counted under the lesser of itself and its reverse
+    complement, as a canonical store does.
+    """
+    if canonical:
+        pair = str.maketrans("ACGT", "TGCA")
+        kmers = [min(kmer, kmer[::-1].translate(pair)) for kmer in kmers]
+    return Counter(kmers)
 
-from malloclabs.kmer_structure import KmerStore
-  
 
 def test_kmer_store_build(filepath : str):
     """
@@ -22,14 +53,526 @@ def test_kmer_store_build(filepath : str):
     This is not marked and is just here for you to test your code.
     """
     ks = KmerStore(31) # test using 31-mers
+    start = time.perf_counter()
     ks.read(filepath)
-    
+    print(f"Serial read: {time.perf_counter() - start:.2f}s")
+
+    parallel = KmerStore(31)
+    start = time.perf_counter()
+    parallel.read(filepath, workers=4)
+    print(f"Parallel read (4 workers): {time.perf_counter() - start:.2f}s")
+
+    kmers = list(ks.freq_geq(1))
+    assert sorted(parallel.freq_geq(1)) == sorted(kmers)
+    assert parallel.count_many(kmers) == ks.count_many(kmers)
+
+
+def test_kmer_store_queries():
+    """
+    Checks the k-mer queries against a brute force count of a small store.
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(5, 500)
+    ks = KmerStore(5)
+    ks.batch_insert(kmers)
+    counts = reference_counts(kmers)
+
+    for kmer in kmers[:50]:
+        assert ks.count(kmer) == counts[kmer]
+        assert ks.count_geq(kmer) == sum(c for x, c in counts.items() if x >= kmer)
+
+    for m in range(1, 6):
+        assert sorted(ks.freq_geq(m)) == sorted(x for x, c in counts.items() if c >= m)
+
+    pair = {"A": "T", "C": "G", "G": "C", "T": "A"}
+    for kmer in kmers[:50]:
+        lead = pair[kmer[-2]] + pair[kmer[-1]]
+        assert ks.compatible(kmer) == sum(1 for x in kmers if x[:2] == lead)
+
+    queries = kmers[:50] + ["AAAAA", "TTTTT"]
+    assert ks.count_many(queries) == [ks.count(x) for x in queries]
+    assert ks.count_geq_many(queries) == [ks.count_geq(x) for x in queries]
+    assert ks.compatible_many(queries) == [ks.compatible(x) for x in queries]
+
+    ks.batch_delete(kmers[:100])
+    assert ks.count(kmers[0]) == 0
+    assert list(ks.freq_geq(1)) == list(ks.freq_geq(0))
+    print("K-mer query tests passed")
+
+
+def test_kmer_store_index():
+    """
+    Round-trips a store through save() and open().
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(7, 500)
+    ks = KmerStore(7)
+    ks.batch_insert(kmers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.kidx")
+        ks.save(path)
+        mapped = KmerStore.open(path)
+
+        for kmer in kmers[:50]:
+            assert mapped.count(kmer) == ks.count(kmer)
+            assert mapped.count_geq(kmer) == ks.count_geq(kmer)
+            assert mapped.compatible(kmer) == ks.compatible(kmer)
+        assert sorted(mapped.freq_geq(2)) == sorted(ks.freq_geq(2))
+
+        # Mutating a mapped store copies it out of the mapping
+        mapped.batch_insert(kmers[:1])
+        assert mapped.count(kmers[0]) == ks.count(kmers[0]) + 1
+
+        # Verification is opt-in, and covers the header fields too
+        assert KmerStore.open(path, verify=True).get_size() == ks.get_size()
+        with open(path, "rb") as f:
+            original = f.read()
+        flags = original[12]
+        for offset, byte in ((-1, b"\xff"), (12, bytes([flags ^ 1]))):
+            with open(path, "r+b") as f:
+                f.write(original)
+                f.seek(offset, os.SEEK_END if offset < 0 else os.SEEK_SET)
+                f.write(byte)
+            KmerStore.open(path)
+            try:
+                KmerStore.open(path, verify=True)
+                assert False, "corrupt index was accepted"
+            except ValueError:
+                pass
+
+    print("K-mer index tests passed")
+
+
+def test_kmer_store_canonical():
+    """
+    Checks that a canonical store counts both strands as one k-mer.
+    This is not marked and is just here for you to test your code.
+    """
+    pair = str.maketrans("ACGT", "TGCA")
+    kmers = random_kmers(5, 500)
+    ks = KmerStore(5, canonical=True)
+    ks.batch_insert(kmers)
+    counts = reference_counts(kmers, canonical=True)
+
+    for kmer in kmers[:50]:
+        rc = kmer[::-1].translate(pair)
+        assert ks.count(kmer) == ks.count(rc) == counts[min(kmer, rc)]
+
+    for kmer in ks.freq_geq(1):
+        assert kmer <= kmer[::-1].translate(pair)
+
+    ks.batch_delete([kmers[0][::-1].translate(pair)])
+    assert ks.count(kmers[0]) == 0
+    print("Canonical k-mer tests passed")
+
+
+def test_kmer_store_approximate():
+    """
+    Checks that an approximate store only ever overestimates.
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(6, 3000)
+    kmers += ["ACGTAC"] * 50
+    exact = KmerStore(6)
+    approx = KmerStore(6, approximate=True, width=512, depth=4, capacity=64)
+    exact.batch_insert(kmers)
+    approx.batch_insert(kmers)
+
+    counts = reference_counts(kmers)
+    for kmer in kmers[:200]:
+        assert exact.count(kmer) == counts[kmer] <= approx.count(kmer)
+        assert approx.compatible(kmer) == exact.compatible(kmer)
+
+    assert set(exact.freq_geq(20)) <= set(approx.freq_geq(20))
+
+    unsupported = [("batch_delete", lambda: approx.batch_delete(kmers[:10])),
+                   ("count_geq", lambda: approx.count_geq(kmers[0])),
+                   ("count_geq_many", lambda: approx.count_geq_many(kmers[:10])),
+                   ("items", lambda: approx.items()),
+                   ("freeze", lambda: approx.freeze()),
+                   ("save", lambda: approx.save(os.devnull))]
+    for operation, call in unsupported:
+        try:
+            call()
+            assert False, f"{operation} ran on an approximate store"
+        except ValueError as error:
+            assert str(error) == f"{operation} is not supported on approximate KmerStores"
+    print("Approximate k-mer tests passed")
+
+
+def test_kmer_store_prefilter():
+    """
+    Checks that a prefiltered store keeps exactly the repeated k-mers.
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(7, 5000)
+    ks = KmerStore(7, prefilter=0.01)
+    ks.batch_insert(kmers)
+    counts = reference_counts(kmers)
+
+    for kmer in kmers[:200]:
+        assert ks.count(kmer) == (counts[kmer] if counts[kmer] > 1 else 0)
+
+    # Once stored, a k-mer is counted even when it is a singleton
+    stored = next(iter(ks.freq_geq(2)))
+    before = ks.count(stored)
+    ks.batch_insert([stored])
+    assert ks.count(stored) == before + 1
+
+    # A smaller filter only admits more false positives, which the
+    # second pass discards
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dna.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(kmers) + "\n")
+        stores = [KmerStore(7, prefilter=0.01), KmerStore(7, prefilter=0.01)]
+        stores[0].read(path)
+        stores[1].read(path, expected_distinct=100)
+        assert list(stores[0].items()) == list(stores[1].items())
+        assert all(count > 1 for _, count in stores[0].items())
+    print("Prefiltered k-mer tests passed")
+
+
+def test_kmer_store_backends():
+    """
+    Checks that the NumPy and pure Python backends agree, when NumPy
+    is installed.
+    This is not marked and is just here for you to test your code.
+    """
+    try:
+        import numpy
+    except ImportError:
+        print("NumPy is not installed, skipping backend tests")
+        return
+
+    kmers = random_kmers(31, 2000)
+    kmers += kmers[:300]
+    stores = [KmerStore(31, backend="python"), KmerStore(31, backend="numpy")]
+
+    for ks in stores:
+        ks.batch_insert(kmers)
+        ks.batch_delete(kmers[:50])
+
+    python, vectorised = stores
+    assert python.get_size() == vectorised.get_size()
+    for kmer in kmers[:300]:
+        assert python.count(kmer) == vectorised.count(kmer)
+        assert python.count_geq(kmer) == vectorised.count_geq(kmer)
+        assert python.compatible(kmer) == vectorised.compatible(kmer)
+    assert sorted(python.freq_geq(2)) == sorted(vectorised.freq_geq(2))
+
+    print("Backend k-mer tests passed")
+
+
+def test_generate_dna():
+    """
+    Checks that generated DNA does not depend on the number of workers,
+    and the repeat, skew and error options of a Workload.
+    This is not marked and is just here for you to test your code.
+    """
+    workload = Workload(repeat=0.5, skew=1.0, error=0.01, seed=7)
+    outputs = []
+    for workers in (1, 4):
+        out = io.BytesIO()
+        generate(out, 3 * SHARD_SIZE + 5, 40, workload, seed=7, workers=workers)
+        outputs.append(out.getvalue())
+    assert outputs[0] == outputs[1]
+    lines = outputs[0].splitlines()
+    assert len(lines) == 3 * SHARD_SIZE + 5
+    assert all(len(line) == 40 and not line.strip(b"ACGT") for line in lines)
+
+    # One repeat element covering each sequence, so only errors differ from it
+    rng = random.Random(7)
+    exact = Workload(repeat=1.0, elements=1, element_length=100)
+    assert all(exact.sequence(100, rng) == exact.library[0] for _ in range(10))
+    noisy = Workload(repeat=1.0, error=0.2, elements=1, element_length=100)
+    changed = sum(a != b for _ in range(100)
+                  for a, b in zip(noisy.sequence(100, rng), noisy.library[0]))
+    assert 0.17 < changed / 10000 < 0.23
+
+    # Skewed choice favours the first repeat elements
+    skewed = Workload(repeat=1.0, skew=2.0, elements=50, element_length=20)
+    chosen = b"".join(skewed.sequence(2000, rng) for _ in range(5))
+    chunks = [chosen[i:i + 20] for i in range(0, len(chosen), 20)]
+    assert chunks.count(skewed.library[0]) > 10 * chunks.count(skewed.library[-1])
+
+    for bad in ({"error": 1.5}, {"error": -0.1}, {"repeat": 2.0}):
+        try:
+            Workload(**bad)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+
+    print("DNA generation tests passed")
+
+
+def test_kmer_store_short():
+    """
+    Checks 1-mers, which have no leading pair for compatible to index,
+    on every backend.
+    This is not marked and is just here for you to test your code.
+    """
+    stores = [KmerStore(1), KmerStore(1, backend="python"), KmerStore(1, approximate=True)]
+    for ks in stores:
+        ks.batch_insert(list("ACGTAAC"))
+        assert [ks.count(base) for base in "ACGT"] == [3, 2, 1, 1]
+        assert ks.compatible("A") == 0
+        assert ks.compatible_many(["A", "T"]) == [0, 0]
+        assert sorted(ks.freq_geq(2)) == ["A", "C"]
+
+    for ks in stores[:2]:
+        assert ks.count_geq("C") == 4
+        ks.batch_delete(["A"])
+        assert ks.count("A") == 0 and ks.get_size() == 3
+
+    print("Short k-mer tests passed")
+
+
+def test_kmer_store_snapshots():
+    """
+    Checks that readers in other threads always see a whole update.
+    Every batch inserts one marker k-mer, so generation g holds it g times.
+    This is not marked and is just here for you to test your code.
+    """
+    ks = KmerStore(5)
+    marker = "ACGTA"
+    done = threading.Event()
+    errors = []
+
+    def reader():
+        last = 0
+        while not done.is_set():
+            snap = ks.snapshot()
+            if snap.count(marker) != snap.get_id() or snap.get_id() < last:
+                errors.append(snap.get_id())
+            last = snap.get_id()
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    for _ in range(50):
+        batch = random_kmers(5, 200)
+        ks.batch_insert([marker] + [x for x in batch if x != marker])
+
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert ks.get_snapshot_id() == 50
+    assert ks.update_metrics()["updates"] == 50
+    print("Snapshot k-mer tests passed")
+
+
+def test_kmer_store_external():
+    """
+    Checks that an external-memory build matches an in-memory one.
+    This is not marked and is just here for you to test your code.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dna.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(random_kmers(150, 200)) + "\n")
+
+        memory = KmerStore(21)
+        memory.read(path)
+        external = KmerStore(21)
+        external.read(path, memory_limit=1 << 16, tmpdir=tmp)
+
+        kmers = sorted(memory.freq_geq(1))
+        assert sorted(external.freq_geq(1)) == kmers
+        assert external.count_many(kmers) == memory.count_many(kmers)
+        assert os.listdir(tmp) == ["dna.txt"]
+
+        # More partitions than open files, so they are written in passes
+        assert math.ceil(kmer_input.estimated_size(path) * 48 / 30000) > 8
+        keys, counts = count_external(path, 21, False, 30000, count_range, merge_runs, 48,
+                                      tmpdir=tmp, max_open=8)
+        assert [(decode(key, 21), count) for key, count in zip(keys, counts)] == list(memory.items())
+        assert os.listdir(tmp) == ["dna.txt"]
+
+        # About 200 partitions under a 100 file limit, which opening them
+        # all at once would exceed
+        if kmer_external.resource is not None:
+            resource = kmer_external.resource
+            soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (100, hard))
+            try:
+                limited = KmerStore(21, backend="python")
+                limited.read(path, memory_limit=7500, tmpdir=tmp)
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+            assert list(limited.items()) == list(memory.items())
+
+        # Memory above the finished store stays near the limit: few distinct
+        # k-mers, so nearly all of the peak is partitioning and counting
+        path = os.path.join(tmp, "repeats.txt")
+        with open(path, "wb") as f:
+            generate(f, 1000, 150, Workload(repeat=1.0, elements=20, element_length=150))
+        limit = 1 << 16
+        backends = ["python"]
+        try:
+            import numpy
+            backends.append("numpy")
+        except ImportError:
+            pass
+        for backend in backends:
+            bounded = KmerStore(21, backend=backend)
+            tracemalloc.start()
+            bounded.read(path, memory_limit=limit, tmpdir=tmp)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert peak - current < 3 * limit
+            assert bounded.get_size() <= 20 * (150 - 21 + 1)
+
+    print("External k-mer tests passed")
+
+
+def test_kmer_store_metrics():
+    """
+    Checks the operation metrics and the profiling hook.
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(9, 1000)
+    ks = KmerStore(9, metrics=True)
+    ks.batch_insert(kmers)
+
+    for kmer in kmers[:100]:
+        ks.count(kmer)
+    with ks.profile("count_geq") as profiler:
+        ks.count_geq(kmers[0])
+
+    stats = ks.stats()
+    assert stats["ingested"] == len(kmers)
+    assert stats["operations"]["count"]["calls"] == 100
+    assert stats["operations"]["count_geq"]["calls"] == 1
+    assert stats["operations"]["count"]["p50_seconds"] <= stats["operations"]["count"]["p99_seconds"]
+    assert stats["memory_bytes"] == memory_summary(ks)["total_bytes"]
+    assert stats["bytes_per_kmer"] > 0
+    assert profiler.getstats()
+
+    # Concurrent readers must not lose calls
+    def reader():
+        for kmer in kmers:
+            ks.count(kmer)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert ks.stats()["operations"]["count"]["calls"] == 100 + 8 * len(kmers)
+
+    ks.enable_metrics(False)
+    ks.count(kmers[0])
+    assert ks.stats()["operations"] == {}
+    print("Metrics k-mer tests passed")
+
+
+def test_kmer_store_formats():
+    """
+    Checks that FASTA, FASTQ and gzipped input count like plain lines,
+    with k-mers broken at N.
+    This is not marked and is just here for you to test your code.
+    """
+    k = 7
+    records = ["".join(random.choice("ACGTN" if i % 40 == 0 else "ACGT") for i in range(150))
+               for _ in range(50)]
+
+    expected: dict[str, int] = {}
+    for record in records:
+        for fragment in record.split("N"):
+            for i in range(len(fragment) - k + 1):
+                expected[fragment[i:i + k]] = expected.get(fragment[i:i + k], 0) + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        paths["lines"] = os.path.join(tmp, "dna.txt")
+        with open(paths["lines"], "w") as f:
+            f.write("".join(record + "\n" for record in records))
+
+        paths["fasta"] = os.path.join(tmp, "dna.fa")
+        with open(paths["fasta"], "w") as f:
+            for i, record in enumerate(records):
+                f.write(f">read{i}\n")
+                f.write("".join(record[j:j + 60].lower() + "\n" for j in range(0, len(record), 60)))
+
+        paths["fastq"] = os.path.join(tmp, "dna.fq.gz")
+        with gzip.open(paths["fastq"], "wt") as f:
+            for i, record in enumerate(records):
+                f.write(f"@read{i}\n{record}\n+\n{'@' * len(record)}\n")
+
+        for backend in ("python", "numpy"):
+            for name, path in paths.items():
+                try:
+                    ks = KmerStore(k, backend=backend)
+                except ValueError:
+                    continue
+                ks.read(path)
+                kmers = sorted(expected)
+                assert sorted(ks.freq_geq(1)) == kmers, (backend, name)
+                assert list(ks.count_many(kmers)) == [expected[kmer] for kmer in kmers], (backend, name)
+
+        external = KmerStore(k)
+        external.read(paths["fastq"], memory_limit=1 << 12, tmpdir=tmp)
+        assert sorted(external.freq_geq(1)) == sorted(expected)
+
+    print("Input format k-mer tests passed")
+
+
+def test_kmer_store_frozen():
+    """
+    Checks that a frozen store answers like the store it was frozen
+    from, takes less memory, and thaws on the next update.
+    This is not marked and is just here for you to test your code.
+    """
+    kmers = random_kmers(31, 5000)
+    queries = kmers[:300] + random_kmers(31, 300)
+    ks = KmerStore(31)
+    ks.batch_insert(kmers + kmers[:1000])
+
+    def answers():
+        return ([ks.count(kmer) for kmer in queries], [ks.count_geq(kmer) for kmer in queries],
+                ks.count_many(queries), ks.count_geq_many(queries),
+                sorted(ks.freq_geq(2)), list(ks.items()))
+
+    expected = answers()
+    used = ks.stats()["memory_bytes"]
+    ks.freeze()
+    assert ks.snapshot().is_frozen()
+    assert answers() == expected
+    assert ks.stats()["memory_bytes"] * 2 < used
+
+    ks.batch_insert(kmers[:1])
+    assert not ks.snapshot().is_frozen()
+    assert ks.count(kmers[0]) == expected[0][0] + 1
+    print("Frozen k-mer tests passed")
+
 
 # The actual program we're running here
 if __name__ == "__main__":
     # Get and parse the command line arguments
     parser = argparse.ArgumentParser(description="COMP3506/7505 Assignment One: Testing K-mer structure")
     parser.add_argument("--build", type=str, help="Path to a file containing DNA sequences.")
+    parser.add_argument("--queries", action="store_true", help="Test the k-mer queries.")
+    parser.add_argument("--index", action="store_true", help="Test saving and opening an index.")
+    parser.add_argument("--canonical", action="store_true", help="Test canonical k-mer counting.")
+    parser.add_argument("--approximate", action="store_true", help="Test approximate k-mer counting.")
+    parser.add_argument("--prefilter", action="store_true", help="Test singleton prefiltering.")
+    parser.add_argument("--backends", action="store_true", help="Test the backends agree.")
+    parser.add_argument("--snapshots", action="store_true", help="Test snapshot isolation.")
+    parser.add_argument("--external", action="store_true", help="Test external-memory builds.")
+    parser.add_argument("--metrics", action="store_true", help="Test operation metrics.")
+    parser.add_argument("--generate", action="store_true", help="Test the DNA generator.")
+    parser.add_argument("--short", action="store_true", help="Test 1-mers on every backend.")
+    parser.add_argument("--formats", action="store_true", help="Test FASTA, FASTQ and gzip input.")
+    parser.add_argument("--frozen", action="store_true", help="Test frozen (compressed) stores.")
     parser.add_argument("--seed", type=int, default='42', help="Seed the PRNG.")
     args = parser.parse_args()
 
@@ -45,5 +588,44 @@ if __name__ == "__main__":
     if args.build:
         test_kmer_store_build(args.build)
 
+    if args.queries:
+        test_kmer_store_queries()
+
+    if args.index:
+        test_kmer_store_index()
+
+    if args.canonical:
+        test_kmer_store_canonical()
+
+    if args.approximate:
+        test_kmer_store_approximate()
+
+    if args.prefilter:
+        test_kmer_store_prefilter()
+
+    if args.backends:
+        test_kmer_store_backends()
+
+    if args.snapshots:
+        test_kmer_store_snapshots()
+
+    if args.external:
+        test_kmer_store_external()
+
+    if args.metrics:
+        test_kmer_store_metrics()
+
+    if args.generate:
+        test_generate_dna()
+
+    if args.short:
+        test_kmer_store_short()
+
+    if args.formats:
+        test_kmer_store_formats()
+
+    if args.frozen:
+        test_kmer_store_frozen()
+
   
     # You probably want to expand with more testing!
@@ -0,0 +1,494 @@
+"""
+Skeleton for COMP3506/7505 A1, S2, 2024
+The University of Queensland
+Joel Mackenzie and Vladimir Morozov
+
+NOTE: This file is not used for assessment. It is just a driver program for
+you to write your own test cases and execute them against your data structures.
+
+Workload record/replay: a trace is a JSON lines file, one operation per
+line, such as {"structure": "dynamicarray", "op": "remove_at", "args": [3]}.
+Each operation is replayed against our structure and against a reference
+built on a Python builtin (list, collections.deque or Counter) with the
+same methods; every result and the final contents must match, and the
+time spent in each operation is reported side by side.
+
+Traces are either generated at random or recorded from real code by
+using a Recorder in place of the structure:
+
+    trace = []
+    store = Recorder(trace, "kmerstore", 21)    # Records KmerStore(21)
+    ...                                         # Use store as usual
+    save_trace(trace, "trace.jsonl")
+
+A {"op": "new"} record starts a structure with those constructor
+arguments, and "instance" tells apart several structures of one kind.
+"""
+
+# Import helper libraries
+import random
+import sys
+import time
+import argparse
+import json
+import os
+import tempfile
+from collections import Counter, deque
+from typing import Any, Callable, Iterator
+
+# Import our data structures
+from structures.linked_list import DoublyLinkedList
+from structures.dynamic_array import DynamicArray
+from structures.bit_vector import BitVector
+from malloclabs.kmer_structure import KmerStore
+
+REPLAY_K = 5        # Short k-mers, so traces hit repeated keys
+BASE_PAIR = {"A": "T", "C": "G", "G": "C", "T": "A"}
+
+
+class ListArray:
+    """
+    The DynamicArray operations on a list.
+    """
+
+    def __init__(self) -> None:
+        self._data: list[Any] = []
+
+    def get_at(self, index: int) -> Any | None:
+        return self._data[index] if 0 <= index < len(self._data) else None
+
+    def set_at(self, index: int, element: Any) -> None:
+        if 0 <= index < len(self._data):
+            self._data[index] = element
+
+    def append(self, element: Any) -> None:
+        self._data.append(element)
+
+    def prepend(self, element: Any) -> None:
+        self._data.insert(0, element)
+
+    def reverse(self) -> None:
+        self._data.reverse()
+
+    def remove(self, element: Any) -> None:
+        if element in self._data:
+            self._data.remove(element)
+
+    def remove_at(self, index: int) -> Any | None:
+        return self._data.pop(index) if 0 <= index < len(self._data) else None
+
+    def get_size(self) -> int:
+        return len(self._data)
+
+
+class DequeList:
+    """
+    The DoublyLinkedList operations on a collections.deque.
+    """
+
+    def __init__(self) -> None:
+        self._data: deque = deque()
+
+    def get_head(self) -> Any | None:
+        return self._data[0] if self._data else None
+
+    def get_tail(self) -> Any | None:
+        return self._data[-1] if self._data else None
+
+    def insert_to_front(self, data: Any) -> None:
+        self._data.appendleft(data)
+
+    def insert_to_back(self, data: Any) -> None:
+        self._data.append(data)
+
+    def remove_from_front(self) -> Any | None:
+        return self._data.popleft() if self._data else None
+
+    def remove_from_back(self) -> Any | None:
+        return self._data.pop() if self._data else None
+
+    def find_element(self, elem: Any) -> bool:
+        return elem in self._data
+
+    def find_and_remove_element(self, elem: Any) -> bool:
+        if elem not in self._data:
+            return False
+        self._data.remove(elem)
+        return True
+
+    def reverse(self) -> None:
+        self._data.reverse()
+
+    def get_size(self) -> int:
+        return len(self._data)
+
+
+class ListBits:
+    """
+    The BitVector operations on a list of 0s and 1s.
+    """
+
+    def __init__(self) -> None:
+        self._data: list[int] = []
+
+    def get_at(self, index: int) -> int | None:
+        return self._data[index] if 0 <= index < len(self._data) else None
+
+    def set_at(self, index: int) -> None:
+        if 0 <= index < len(self._data):
+            self._data[index] = 1
+
+    def unset_at(self, index: int) -> None:
+        if 0 <= index < len(self._data):
+            self._data[index] = 0
+
+    def append(self, state: int) -> None:
+        self._data.append(1 if state else 0)
+
+    def prepend(self, state: int) -> None:
+        self._data.insert(0, 1 if state else 0)
+
+    def reverse(self) -> None:
+        self._data.reverse()
+
+    def get_size(self) -> int:
+        return len(self._data)
+
+
+class CounterStore:
+    """
+    The KmerStore operations on a Counter, answering each query by
+    brute force over the distinct k-mers.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter = Counter()
+
+    def batch_insert(self, kmers: list[str]) -> None:
+        self._counts.update(kmers)
+
+    def batch_delete(self, kmers: list[str]) -> None:
+        for kmer in set(kmers):
+            self._counts.pop(kmer, None)
+
+    def count(self, kmer: str) -> int:
+        return self._counts[kmer]
+
+    def count_geq(self, kmer: str) -> int:
+        return sum(count for key, count in self._counts.items() if key >= kmer)
+
+    def compatible(self, kmer: str) -> int:
+        lead = BASE_PAIR[kmer[-2]] + BASE_PAIR[kmer[-1]]
+        return sum(count for key, count in self._counts.items() if key[:2] == lead)
+
+    def freq_geq(self, m: int) -> list[str]:
+        return [key for key, count in self._counts.items() if count >= m]
+
+    def items(self) -> list[tuple[str, int]]:
+        return sorted(self._counts.items())
+
+    def get_size(self) -> int:
+        return len(self._counts)
+
+
+def random_index(rng: random.Random, reference: Any) -> list[int]:
+    # Mostly valid indices, and a few just out of bounds either side
+    return [rng.randrange(-1, reference.get_size() + 1)]
+
+
+def random_value(rng: random.Random, reference: Any) -> list[int]:
+    return [rng.randrange(64)]
+
+
+def random_kmers(rng: random.Random, reference: Any) -> list[list[str]]:
+    size = rng.randrange(1, 64)
+    return [["".join(rng.choice("ACGT") for _ in range(REPLAY_K)) for _ in range(size)]]
+
+
+def random_kmer(rng: random.Random, reference: Any) -> list[str]:
+    return random_kmers(rng, reference)[0][:1]
+
+
+def no_args(rng: random.Random, reference: Any) -> list:
+    return []
+
+
+# Per structure: our structure, its reference, the final contents of
+# either, and the operation mix as {op: (weight, argument generator)}
+WORKLOADS: dict[str, tuple[Callable[[], Any], Callable[[], Any], Callable[[Any], Any],
+                           dict[str, tuple[int, Callable[[random.Random, Any], list]]]]] = {
+    "dynamicarray": (
+        DynamicArray, ListArray,
+        lambda array: [array.get_at(i) for i in range(array.get_size())],
+        {
+            "append": (30, random_value),
+            "prepend": (20, random_value),
+            "get_at": (20, random_index),
+            "set_at": (10, lambda rng, ref: random_index(rng, ref) + random_value(rng, ref)),
+            "remove_at": (12, random_index),
+            "remove": (4, random_value),
+            "reverse": (2, no_args),
+            "get_size": (2, no_args),
+        },
+    ),
+    "linkedlist": (
+        DoublyLinkedList, DequeList,
+        lambda linked: [linked.remove_from_front() if i % 2 else linked.remove_from_back()
+                        for i in range(linked.get_size())],
+        {
+            "insert_to_front": (20, random_value),
+            "insert_to_back": (20, random_value),
+            "remove_from_front": (8, no_args),
+            "remove_from_back": (8, no_args),
+            "find_element": (10, random_value),
+            "find_and_remove_element": (12, random_value),
+            "get_head": (5, no_args),
+            "get_tail": (5, no_args),
+            "reverse": (2, no_args),
+            "get_size": (2, no_args),
+        },
+    ),
+    "bitvector": (
+        BitVector, ListBits,
+        lambda bits: [bits.get_at(i) for i in range(bits.get_size())],
+        {
+            "append": (25, lambda rng, ref: [rng.randrange(2)]),
+            "prepend": (15, lambda rng, ref: [rng.randrange(2)]),
+            "get_at": (25, random_index),
+            "set_at": (10, random_index),
+            "unset_at": (10, random_index),
+            "reverse": (2, no_args),
+            "get_size": (2, no_args),
+        },
+    ),
+    "kmerstore": (
+        lambda k=REPLAY_K: KmerStore(k), CounterStore,
+        lambda store: sorted(store.items()),
+        {
+            "batch_insert": (10, random_kmers),
+            "batch_delete": (2, random_kmers),
+            "count": (30, random_kmer),
+            "count_geq": (20, random_kmer),
+            "compatible": (20, random_kmer),
+            "freq_geq": (5, lambda rng, ref: [rng.randrange(1, 4)]),
+            "get_size": (2, no_args),
+        },
+    ),
+}
+
+
+def generate_trace(structures: list[str], ops: int, seed: int) -> list[dict[str, Any]]:
+    """
+    Generate @ops@ random operations per structure, interleaved. The
+    arguments are drawn against a reference kept up to date as the trace
+    grows, so indices and deletions mostly hit existing elements.
+    """
+    rng = random.Random(seed)
+    references = {name: WORKLOADS[name][1]() for name in structures}
+    pending = [name for name in structures for _ in range(ops)]
+    rng.shuffle(pending)
+    trace = []
+
+    for name in pending:
+        mix = WORKLOADS[name][3]
+        op = rng.choices(list(mix), [weight for weight, _ in mix.values()])[0]
+        args = mix[op][1](rng, references[name])
+        getattr(references[name], op)(*args)
+        trace.append({"structure": name, "op": op, "args": args})
+
+    return trace
+
+
+class Recorder:
+    """
+    Build one of our structures, named as in WORKLOADS, from @args@ and
+    forward every call to it, appending the calls its reference can
+    replay to @trace@. Other calls are forwarded but not recorded.
+    Arguments are copied into the trace when the call is made, so they
+    must be JSON values.
+    """
+
+    def __init__(self, trace: list[dict[str, Any]], name: str, *args: Any,
+                 instance: int = 0) -> None:
+        self._trace = trace
+        self._name = name
+        self._instance = instance
+        self._target = WORKLOADS[name][0](*args)
+        self._log("new", args)
+
+    def __getattr__(self, op: str) -> Any:
+        method = getattr(self._target, op)
+        if op.startswith("_") or not hasattr(WORKLOADS[self._name][1], op):
+            return method
+
+        def call(*args: Any) -> Any:
+            self._log(op, args)
+            return method(*args)
+
+        return call
+
+    def _log(self, op: str, args: tuple) -> None:
+        self._trace.append({"structure": self._name, "instance": self._instance,
+                            "op": op, "args": json.loads(json.dumps(args))})
+
+
+def save_trace(trace: list[dict[str, Any]], path: str) -> None:
+    with open(path, "w") as outfile:
+        for record in trace:
+            outfile.write(json.dumps(record) + "\n")
+
+
+def load_trace(path: str) -> list[dict[str, Any]]:
+    with open(path) as infile:
+        return [json.loads(line) for line in infile if line.strip()]
+
+
+def timed_call(target: Any, op: str, args: list) -> tuple[Any, float]:
+    """
+    Call target.op(*args) and return its result and the time it took,
+    draining a lazy result into a sorted list inside the timed region.
+    """
+    start = time.perf_counter()
+    result = getattr(target, op)(*args)
+    if isinstance(result, Iterator) or op == "freq_geq":
+        result = sorted(result)
+    return result, time.perf_counter() - start
+
+
+def replay(trace: list[dict[str, Any]]) -> dict[tuple[str, str], list[float]]:
+    """
+    Replay the trace against our structures and the references, failing
+    on the first result or final content that differs. Return the calls,
+    our seconds and the reference seconds per (structure, op).
+    """
+    ours: dict[tuple[str, int], Any] = {}
+    references: dict[tuple[str, int], Any] = {}
+    timings: dict[tuple[str, str], list[float]] = {}
+
+    for step, record in enumerate(trace):
+        name, op, args = record["structure"], record["op"], record["args"]
+        key = (name, record.get("instance", 0))
+        if op == "new":
+            ours[key] = WORKLOADS[name][0](*args)
+            references[key] = WORKLOADS[name][1]()
+            continue
+        if key not in ours:
+            ours[key] = WORKLOADS[name][0]()
+            references[key] = WORKLOADS[name][1]()
+
+        got, ours_seconds = timed_call(ours[key], op, args)
+        expected, reference_seconds = timed_call(references[key], op, args)
+        assert got == expected, \
+            f"step {step}: {name}.{op}{tuple(args)} returned {got!r}, expected {expected!r}"
+
+        timing = timings.setdefault((name, op), [0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += ours_seconds
+        timing[2] += reference_seconds
+
+    for key in ours:
+        contents = WORKLOADS[key[0]][2]
+        assert contents(ours[key]) == contents(references[key]), \
+            f"{key[0]} {key[1]}: final contents differ from the reference"
+
+    return timings
+
+
+def report(timings: dict[tuple[str, str], list[float]]) -> None:
+    print(f"{'structure':<14}{'op':<26}{'calls':>8}{'ours op/s':>14}"
+          f"{'reference op/s':>16}{'slowdown':>10}")
+    for (name, op), (calls, ours_seconds, reference_seconds) in sorted(timings.items()):
+        ours_rate = calls / ours_seconds if ours_seconds else float("inf")
+        reference_rate = calls / reference_seconds if reference_seconds else float("inf")
+        slowdown = ours_seconds / reference_seconds if reference_seconds else float("inf")
+        print(f"{name:<14}{op:<26}{int(calls):>8}{ours_rate:>14,.0f}"
+              f"{reference_rate:>16,.0f}{slowdown:>9.2f}x")
+
+
+def test_replay(trace: list[dict[str, Any]]) -> None:
+    """
+    Replay a trace differentially and report the throughput per op.
+    """
+    print(f"==== Replaying {len(trace)} Operations ====")
+    report(replay(trace))
+    print("All results matched the references")
+
+
+def test_recorder() -> None:
+    """
+    Record calls made through Recorders, save and reload the trace, and
+    replay it.
+    """
+    trace: list[dict[str, Any]] = []
+    array = Recorder(trace, "dynamicarray")
+    for i in range(100):
+        if i % 3:
+            array.append(i)
+        else:
+            array.prepend(i)
+    array.reverse()
+    while array.get_size() > 50:
+        array.remove_at(array.get_size() // 2)
+
+    queue = Recorder(trace, "linkedlist")
+    other = Recorder(trace, "linkedlist", instance=1)
+    for i in range(50):
+        queue.insert_to_back(i)
+        other.insert_to_front(i)
+    assert queue.find_and_remove_element(25) and not other.find_element(50)
+
+    kmers = ["".join(random.choice("ACGT") for _ in range(7)) for _ in range(500)]
+    store = Recorder(trace, "kmerstore", 7)
+    store.batch_insert(kmers)
+    assert store.count(kmers[0]) >= 1
+    kmers.clear()   # The trace keeps its own copy
+    frequent = list(store.freq_geq(2))
+    store.batch_delete(frequent[:5])
+    assert array.memory_usage()["total_bytes"] > 0     # Forwarded, not recorded
+
+    assert [record["op"] for record in trace].count("new") == 4
+    assert all(record["op"] != "memory_usage" for record in trace)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        save_trace(trace, path)
+        assert load_trace(path) == trace
+    test_replay(trace)
+
+
+# The actual program we're running here
+if __name__ == "__main__":
+    # Get and parse the command line arguments
+    parser = argparse.ArgumentParser(description="COMP3506/7505 Assignment One: Workload Record/Replay")
+
+    parser.add_argument("--generate", action="store_true", help="Generate a random trace and replay it.")
+    parser.add_argument("--replay", type=str, help="Replay the trace in this JSON lines file.")
+    parser.add_argument("--save-trace", type=str, help="Also save the generated trace to this file.")
+    parser.add_argument("--recorder", action="store_true", help="Test recording real calls.")
+    parser.add_argument("--structures", nargs="+", choices=sorted(WORKLOADS),
+                        default=sorted(WORKLOADS), help="Structures in the generated trace.")
+    parser.add_argument("--ops", type=int, default=2000, help="Generated operations per structure.")
+    parser.add_argument("--seed", type=int, default='42', help="Seed the PRNG.")
+
+    args = parser.parse_args()
+
+    # No arguments passed
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(-1)
+
+    # Seed the PRNG in case you are using randomness
+    random.seed(args.seed)
+
+    if args.generate:
+        trace = generate_trace(args.structures, args.ops, args.seed)
+        if args.save_trace:
+            save_trace(trace, args.save_trace)
+            print(f"Saved {len(trace)} operations to {args.save_trace}")
+        test_replay(trace)
+
+    if args.recorder:
+        test_recorder()
+
+    if args.replay:
+        test_replay(load_trace(args.replay))
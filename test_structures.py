@@ -17,6 +17,12 @@ import argparse
 from structures.linked_list import Node, DoublyLinkedList
 from structures.dynamic_array import DynamicArray 
 from structures.bit_vector import BitVector
+from structures.bloom_filter import BloomFilter
+from structures.priority_queue import PriorityQueue, merge_sorted
+from structures.memory import memory_summary
+from structures.elias_fano import EliasFano
+from structures.packed_array import PackedArray
+from structures.int_set import IntSet, IntCounter
 
 def test_linked_list():
     """
@@ -70,6 +76,42 @@ def test_dynamic_array():
     """
     print ("==== Executing Dynamic Array Tests ====")
 
+    # Mirror random operations on a plain list and compare
+    my_array = DynamicArray()
+    expected = []
+    for _ in range(2000):
+        op = random.randrange(5)
+        value = random.randrange(50)
+        if op == 0:
+            my_array.append(value)
+            expected.append(value)
+        elif op == 1:
+            my_array.prepend(value)
+            expected.insert(0, value)
+        elif op == 2:
+            my_array.reverse()
+            expected.reverse()
+        elif op == 3 and expected:
+            index = random.randrange(len(expected))
+            assert my_array.remove_at(index) == expected.pop(index)
+        elif op == 4 and value in expected:
+            my_array.remove(value)
+            expected.remove(value)
+
+    assert my_array.get_size() == len(expected)
+    assert [my_array[i] for i in range(len(expected))] == expected
+
+    # Views and snapshots keep the contents they were made with
+    view = my_array.view(2, 10)
+    snapshot = my_array.snapshot()
+    my_array.reverse()
+    my_array.append(-1)
+    my_array.set_at(0, -2)
+    assert list(view) == expected[2:10]
+    assert list(view.view(1, 3)) == expected[3:5]
+    assert [snapshot[i] for i in range(snapshot.get_size())] == expected
+    assert list(my_array.view(0, 3)) == [-2] + expected[::-1][1:3]
+
 def test_bitvector():
     """
     A simple set of tests for the bit vector implementation.
@@ -77,6 +119,190 @@ def test_bitvector():
     """
     print ("==== Executing Bit Vector Tests ====")
 
+    # Mirror random operations on a plain list and compare
+    my_bits = BitVector()
+    expected = []
+    for _ in range(2000):
+        op = random.randrange(5)
+        state = random.randrange(2)
+        if op == 0:
+            my_bits.append(state)
+            expected.append(state)
+        elif op == 1:
+            my_bits.prepend(state)
+            expected.insert(0, state)
+        elif op == 2:
+            my_bits.reverse()
+            expected.reverse()
+        elif op == 3 and expected:
+            index = random.randrange(len(expected))
+            my_bits[index] = state
+            expected[index] = state
+        elif op == 4:
+            count = random.randrange(200)
+            my_bits.extend(count, state)
+            expected.extend([state] * count)
+
+    assert my_bits.get_size() == len(expected)
+    assert [my_bits[i] for i in range(len(expected))] == expected
+    assert my_bits[len(expected)] is None
+
+def test_bloom_filter():
+    """
+    A simple set of tests for the Bloom filter.
+    This is not marked and is just here for you to test your code.
+    """
+    print ("==== Executing Bloom Filter Tests ====")
+
+    bloom = BloomFilter(10000, 0.01)
+    added = random.sample(range(2**62), 10000)
+    for key in added:
+        bloom.add(key)
+
+    # No false negatives, and roughly the requested false positive rate
+    assert all(key in bloom for key in added)
+    others = [random.randrange(2**62) for _ in range(10000)]
+    rate = sum(1 for key in others if key in bloom) / len(others)
+    print(f"False positive rate: {rate:.4f}")
+    assert rate < 0.03
+
+
+def test_priority_queue():
+    """
+    A simple set of tests for the priority queue.
+    This is not marked and is just here for you to test your code.
+    """
+    print ("==== Executing Priority Queue Tests ====")
+
+    values = [random.randrange(1000) for _ in range(500)]
+    queue = PriorityQueue(values)
+    assert [queue.pop() for _ in range(len(values))] == sorted(values)
+    assert queue.pop() is None
+
+    # Biggest first through a key, with pushpop and replace mixed in
+    queue = PriorityQueue(key=lambda x: -x)
+    expected = []
+    for value in values:
+        if expected and random.randrange(3) == 0:
+            largest = max(expected)
+            if value >= largest:
+                assert queue.pushpop(value) == value
+            else:
+                assert queue.pushpop(value) == largest
+                expected.remove(largest)
+                expected.append(value)
+        elif expected and random.randrange(3) == 0:
+            largest = max(expected)
+            assert queue.replace(value) == largest
+            expected.remove(largest)
+            expected.append(value)
+        else:
+            queue.push(value)
+            expected.append(value)
+    assert queue.get_size() == len(expected)
+    assert [queue.pop() for _ in range(len(expected))] == sorted(expected, reverse=True)
+
+    runs = [sorted(random.sample(range(1000), random.randrange(20))) for _ in range(10)]
+    assert list(merge_sorted(runs)) == sorted(x for run in runs for x in run)
+    words = [sorted(("x" * random.randrange(1, 30) for _ in range(10)), key=len) for _ in range(5)]
+    assert [len(w) for w in merge_sorted(words, key=len)] == sorted(len(w) for run in words for w in run)
+
+def test_memory_usage():
+    """
+    A simple set of tests for the memory accounting.
+    This is not marked and is just here for you to test your code.
+    """
+    print ("==== Executing Memory Usage Tests ====")
+
+    my_array = DynamicArray()
+    for i in range(100):
+        my_array.append(str(i) * 10)
+    shallow = my_array.memory_usage()
+    deep = my_array.memory_usage(deep=True)
+    assert shallow["unused_slots"] == my_array.get_capacity() - 100
+    assert shallow["payload_bytes"] == 0 and deep["payload_bytes"] > 0
+    assert deep["total_bytes"] == shallow["total_bytes"] + deep["payload_bytes"]
+
+    my_bits = BitVector()
+    my_bits.extend(1000, 1)
+    usage = my_bits.memory_usage()
+    assert usage["payload_bytes"] == 125
+    assert usage["unused_bits"] == 24
+
+    my_list = DoublyLinkedList()
+    for i in range(10):
+        my_list.insert_to_back(Node(i))
+    assert my_list.memory_usage()["slot_overhead_bytes"] > 0
+
+    # The graph walk sees the array, its buffer and the distinct strings
+    summary = memory_summary(my_array)
+    assert summary["by_type"]["str"] == deep["payload_bytes"]
+    assert summary["total_bytes"] >= deep["total_bytes"]
+
+def test_elias_fano():
+    """
+    A simple set of tests for select, packed arrays and Elias-Fano.
+    This is not marked and is just here for you to test your code.
+    """
+    print ("==== Executing Elias-Fano Tests ====")
+
+    my_bits = BitVector()
+    expected = [random.randrange(2) for _ in range(3000)]
+    for state in expected:
+        my_bits.prepend(state)
+    my_bits.reverse()
+    for state in (0, 1):
+        positions = [i for i, bit in enumerate(expected) if bit == state]
+        assert [my_bits.select(rank, state) for rank in range(len(positions))] == positions
+        assert my_bits.select(len(positions), state) is None
+
+    values = [random.randrange(2**random.randrange(64)) for _ in range(500)]
+    packed = PackedArray(values)
+    assert list(packed) == values
+    assert [packed[i] for i in range(len(values))] == values
+
+    universe = 2**40
+    values = sorted(random.randrange(universe) for _ in range(2000))
+    coded = EliasFano(values, universe)
+    assert list(coded) == values
+    assert [coded[i] for i in range(0, len(values), 7)] == values[::7]
+    for value in values[:100] + [random.randrange(universe) for _ in range(100)]:
+        index = coded.find(value)
+        assert (index == len(values) or values[index] >= value) and (index == 0 or values[index - 1] < value)
+
+def test_int_set():
+    """
+    A simple set of tests for the integer hash set and counter.
+    This is not marked and is just here for you to test your code.
+    """
+    print ("==== Executing Int Set Tests ====")
+
+    # Mirror random operations on a set and a dict and compare
+    my_set = IntSet(load_factor=0.75)
+    my_counter = IntCounter()
+    expected = set()
+    counts = {}
+    for _ in range(5000):
+        key = random.randrange(500) * random.choice([1, -1, 2**40])
+        if random.randrange(3):
+            assert my_set.add(key) == (key not in expected)
+            assert my_counter.add(key) == counts.get(key, 0) + 1
+            expected.add(key)
+            counts[key] = counts.get(key, 0) + 1
+        else:
+            assert my_set.remove(key) == (key in expected)
+            assert my_counter.remove(key) == counts.pop(key, 0)
+            expected.discard(key)
+        assert (key in my_set) == (key in expected)
+        assert my_counter[key] == counts.get(key, 0)
+
+    assert my_set.get_size() == len(expected)
+    assert sorted(my_set) == sorted(expected)
+    assert dict(my_counter.items()) == counts
+    assert my_set.get_size() <= 0.75 * my_set.get_capacity()
+
+    my_set.update(range(1000))
+    assert all(key in my_set for key in range(1000))
 
 
 # The actual program we're running here
@@ -87,6 +313,11 @@ if __name__ == "__main__":
     parser.add_argument("--linkedlist", action="store_true", help="Test your linked list.")
     parser.add_argument("--dynamicarray", action="store_true", help="Test your dynamic array.")
     parser.add_argument("--bitvector", action="store_true", help="Test your bit vector.")
+    parser.add_argument("--bloomfilter", action="store_true", help="Test the Bloom filter.")
+    parser.add_argument("--priorityqueue", action="store_true", help="Test the priority queue.")
+    parser.add_argument("--memory", action="store_true", help="Test the memory accounting.")
+    parser.add_argument("--eliasfano", action="store_true", help="Test select and Elias-Fano coding.")
+    parser.add_argument("--intset", action="store_true", help="Test the integer hash set and counter.")
     parser.add_argument("--seed", type=int, default='42', help="Seed the PRNG.")
     
     args = parser.parse_args()
@@ -108,3 +339,18 @@ if __name__ == "__main__":
 
     if args.bitvector:
         test_bitvector()
+
+    if args.bloomfilter:
+        test_bloom_filter()
+
+    if args.priorityqueue:
+        test_priority_queue()
+
+    if args.memory:
+        test_memory_usage()
+
+    if args.eliasfano:
+        test_elias_fano()
+
+    if args.intset:
+        test_int_set()
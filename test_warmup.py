@@ -12,7 +12,12 @@ import random
 import sys
 import time
 import argparse
+import gc
+import math
+import tracemalloc
+from functools import lru_cache
 
+from warmup import warmup
 from warmup.warmup import * 
 
 def test_main_character():
@@ -20,7 +25,11 @@ def test_main_character():
     A simple set of tests for the main character problem.
     This is not marked and is just here for you to test your code.
     """
-    assert (main_character([1,2,3,4,5]) == 0)
+    assert (main_character([1,2,3,4,5]) == -1)
+    assert (main_character([1,2,1,4,4,4]) == 2)
+    assert (main_character([7,1,2,7]) == 3)
+    assert (main_character([60000,120000,654321,999,1337,133731337]) == -1)
+    assert (main_character(iter([5,2**32-1,2**32-1])) == 2)
  
 
 def test_missing_odds():
@@ -28,24 +37,201 @@ def test_missing_odds():
     A simple set of tests for the missing odds problem.
     This is not marked and is just here for you to test your code.
     """
+    assert (missing_odds([1,2]) == 0)
+    assert (missing_odds([1,3]) == 0)
+    assert (missing_odds([1,4]) == 3)
+    assert (missing_odds([4,1]) == 3)
+    assert (missing_odds([4,1,8,5]) == 10)
+    assert (missing_odds(iter([4,1,8,5])) == 10)
+
+    for _ in range(100):
+        inputs = random.sample(range(1000), random.randint(1, 50))
+        expected = sum(i for i in range(min(inputs), max(inputs) + 1) if i % 2 and i not in inputs)
+        assert (missing_odds(inputs) == expected)
 
 def test_k_cool():
     """
     A simple set of tests for the k cool problem.
     This is not marked and is just here for you to test your code.
     """
+    assert (k_cool(2, 1) == 1)
+    assert (k_cool(2, 3) == 3)
+    assert (k_cool(3, 5) == 10)
+    assert (k_cool(10, 42) == 101010)
+    assert (k_cool(128, 5000) == 9826529652304384)
+
+    modulus = 10**16 + 61
+    for _ in range(100):
+        k = random.randint(2, 10**42)
+        n = random.randint(1, 2**random.randint(1, 1000))
+        expected = sum(pow(k, i, modulus) for i in range(n.bit_length()) if n >> i & 1)
+        assert (k_cool(k, n) == expected % modulus)
 
 def test_number_game():
     """
     A simple set of tests for the number game problem.
     This is not marked and is just here for you to test your code.
     """
+    assert (number_game([5,2,7,3]) == ("Bob", 5))
+    assert (number_game([3,2,1,0]) == ("Tie", 0))
+    assert (number_game([2,2,2,2]) == ("Alice", 4))
+
+    # Small values so that games have repeats and ties
+    games = [[random.randint(0, 12) for _ in range(2 * random.randint(1, 5))] for _ in range(200)]
+    expected = [number_game_minimax(numbers) for numbers in games]
+    assert (number_game_many(games) == expected)
+    assert ([number_game(numbers) for numbers in games] == expected)
+
+    # Again without NumPy, for the pure Python fallback
+    numpy, warmup.np = warmup.np, None
+    try:
+        assert (number_game_many(games) == expected)
+    finally:
+        warmup.np = numpy
+
+def number_game_minimax(numbers: list[int]) -> tuple[str, int]:
+    """
+    Brute force number_game: try every move, each player maximising
+    their lead over the other. Only for short games.
+    """
+    @lru_cache(maxsize=None)
+    def play(left: tuple[int, ...], alice_turn: bool) -> tuple[int, int]:
+        if not left:
+            return (0, 0)
+        best = None
+        for i in range(len(left)):
+            alice, bob = play(left[:i] + left[i + 1:], not alice_turn)
+            if alice_turn and left[i] % 2 == 0:
+                alice += left[i]
+            if not alice_turn and left[i] % 2 == 1:
+                bob += left[i]
+            lead = alice - bob if alice_turn else bob - alice
+            if best is None or lead > best[0]:
+                best = (lead, (alice, bob))
+        return best[1] # type: ignore
+
+    alice, bob = play(tuple(sorted(numbers)), True)
+    if alice > bob:
+        return ("Alice", alice)
+    if bob > alice:
+        return ("Bob", bob)
+    return ("Tie", alice)
 
 def test_road_illumination():
     """
     A simple set of tests for the road illumination problem.
     This is not marked and is just here for you to test your code.
     """
+    assert (road_illumination(15, [15,5,3,7,9,14,0]) == 2.5)
+    assert (road_illumination(5, [2,5]) == 2.0)
+
+    # The darkest point is an end of the road or the middle of a gap
+    poles = [random.randint(0, 1000) for _ in range(5)]
+    index = RoadIndex(poles)
+    for _ in range(200):
+        pole = random.randint(0, 1000)
+        index.add_pole(pole)
+        poles.append(pole)
+        road_length = random.randint(0, 1200)
+        ordered = sorted(poles)
+        points = [0, road_length] + [(a + b) / 2 for a, b in zip(ordered, ordered[1:]) if a + b <= 2 * road_length]
+        expected = max(min(abs(point - p) for p in poles) for point in points)
+        assert (abs(index.radius(road_length) - expected) < 1e-6)
+
+# Input sizes at the "It works", "Exhaustive" and "Welcome to COMP3506" tier
+# limits from the warmup docstrings, and a generator for each tier's input
+BENCH_TIERS = {
+    # Distinct values, so the whole input is read
+    "main_character": [
+        (n, lambda rng, n=n: (rng.sample(range(2**32), n),))
+        for n in (10_000, 300_000, 5_000_000)
+    ],
+    "missing_odds": [
+        (n, lambda rng, n=n, top=top: (rng.sample(range(top + 1), n),))
+        for n, top in ((10_000, 10**4), (300_000, 10**6), (5_000_000, 10**16))
+    ],
+    # Sized by the bits of n, which is what k_cool works through
+    "k_cool": [
+        (int(math.log2(10) * digits), lambda rng, k=k, digits=digits: (rng.randint(2, k), rng.randint(1, 10**digits)))
+        for k, digits in ((128, 4), (10**16, 100), (10**42, 100_000))
+    ],
+    "number_game": [
+        (n, lambda rng, n=n, top=top: ([rng.randint(0, top) for _ in range(n)],))
+        for n, top in ((10_000, 10**6), (100_000, 10**16), (300_000, 10**16))
+    ],
+    "road_illumination": [
+        (n, lambda rng, n=n, top=top: (rng.randint(0, top), [rng.randint(0, top) for _ in range(n)]))
+        for n, top in ((10_000, 10**6), (100_000, 10**16), (300_000, 10**16))
+    ],
+}
+
+# Seconds and MiB of peak traced memory a single call may take at any tier
+BENCH_BUDGETS = {
+    "main_character": (10.0, 256),
+    "missing_odds": (5.0, 16),
+    "k_cool": (1.0, 16),
+    "number_game": (2.0, 64),
+    "road_illumination": (2.0, 64),
+}
+
+
+def fit_exponent(sizes: list[int], seconds: list[float]) -> float:
+    """
+    Return the least-squares slope of log(time) against log(size), so
+    1.0 means linear scaling and 2.0 quadratic.
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(second, 1e-9)) for second in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def test_bench(seed: int, tiers: int, budget_scale: float):
+    """
+    Runs every warmup problem on seeded inputs at the first @tiers@ tier
+    limits, timing one call and tracing the peak memory of another, and
+    fits the growth of time with input size. Fails if any call goes over
+    its budget in BENCH_BUDGETS, with time budgets scaled by @budget_scale@.
+    This is not marked and is just here for you to test your code.
+    """
+    failures = []
+
+    for name, tier_inputs in BENCH_TIERS.items():
+        function = globals()[name]
+        limit, megabytes = BENCH_BUDGETS[name]
+        sizes, seconds = [], []
+
+        for tier, (size, generate) in enumerate(tier_inputs[:tiers]):
+            inputs = generate(random.Random(seed + tier))
+
+            gc.collect()
+            start = time.perf_counter()
+            function(*inputs)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            function(*inputs)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            del inputs
+
+            sizes.append(size)
+            seconds.append(elapsed)
+            print(f"{name:18} tier {tier + 1}  n={size:<10} {elapsed:9.4f}s  {peak:9.2f} MiB")
+
+            if elapsed > limit * budget_scale:
+                failures.append(f"{name} tier {tier + 1}: {elapsed:.2f}s > {limit * budget_scale:.2f}s")
+            if peak > megabytes:
+                failures.append(f"{name} tier {tier + 1}: {peak:.1f} MiB > {megabytes} MiB")
+
+        if len(sizes) > 1:
+            print(f"{name:18} time ~ n^{fit_exponent(sizes, seconds):.2f}")
+
+    assert not failures, "Over budget:\n" + "\n".join(failures)
+    print("Warmup benchmarks within budget")
+
 
 # The actual program we're running here
 if __name__ == "__main__":
@@ -57,6 +243,9 @@ if __name__ == "__main__":
     parser.add_argument("--kcool", action="store_true", help="Test your k-cool sol.")
     parser.add_argument("--numbergame", action="store_true", help="Test your number game sol.")
     parser.add_argument("--road", action="store_true", help="Test your road illumination sol.")
+    parser.add_argument("--bench", action="store_true", help="Benchmark every sol. at the tier limits.")
+    parser.add_argument("--tiers", type=int, default=3, help="Number of tiers to benchmark.")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Scale the benchmark time budgets.")
     parser.add_argument("--seed", type=int, default='42', help="Seed the PRNG.")
     args = parser.parse_args()
 
@@ -84,3 +273,6 @@ if __name__ == "__main__":
     if args.road:
         test_road_illumination()
 
+    if args.bench:
+        test_bench(args.seed, args.tiers, args.budget_scale)
+
@@ -28,12 +28,33 @@ There will be hidden tests in each category that will be published only after th
 You may wish to import your data structures to help you with some of the
 problems. Or maybe not. We did it for you just in case.
 """
-from structures.bit_vector import BitVector
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Sized
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from structures.dynamic_array import DynamicArray
+from structures.hashing import FIBONACCI, MASK64
 from structures.linked_list import DoublyLinkedList, Node
 
+# Elements per NumPy chunk in missing_odds
+CHUNK_SIZE = 1 << 20
+
+# k_cool: modulus, leaf size in bits, and the memoized power tables
+MODULUS = 10**16 + 61
+LEAF_BITS = 64
+POWER_CACHE_LIMIT = 1024
+_powers: dict[int, tuple[list[int], list[int]]] = {}
 
-def main_character(instring: list[int]) -> int:
+# RoadIndex: poles per block, and blocks split beyond twice that
+POLE_BLOCK = 128
+
+
+def main_character(instring: Iterable[int]) -> int:
     """
     @instring@ is an array of integers in the range [0, 2^{32}-1].
     Return the first position a repeat integer is encountered, or -1 if
@@ -54,21 +75,53 @@ def main_character(instring: list[int]) -> int:
     main_character([1, 2, 1, 4, 4, 4]) == 2
     main_character([7, 1, 2, 7]) == 3
     main_character([60000, 120000, 654321, 999, 1337, 133731337]) == -1
+
+    The integers seen so far go into an open-addressing hash set with
+    linear probing, which doubles when half full, so memory follows the
+    number of elements read rather than the 2^32 possible values.
+    @instring@ may be any iterable and is consumed as a stream.
+    Time complexity: O(n) expected
     """
-    bitvector = BitVector()
+    # Sized inputs get a table that never needs to grow
+    bits = max(10, (2 * len(instring)).bit_length()) if isinstance(instring, Sized) else 10
+    table = array("q", [-1]) * (1 << bits)
+    mask = (1 << bits) - 1
+    size = 0
+
+    for position, num in enumerate(instring):
+        slot = ((num * FIBONACCI) & MASK64) >> (64 - bits)
+        while table[slot] != -1:
+            if table[slot] == num:
+                return position
+            slot = (slot + 1) & mask
+        table[slot] = num
+        size += 1
+
+        if 2 * size > mask:
+            bits += 1
+            table = _rehash(table, bits)
+            mask = (1 << bits) - 1
+
+    return -1
 
-    for i in range(2**32):
-        bitvector.append(0)
 
-    for num in instring:
-        if bitvector.get_at(num) == 1:
-            return num
+def _rehash(table: array, bits: int) -> array:
+    """
+    Return a table of 2^@bits@ slots holding the values of @table@.
+    """
+    grown = array("q", [-1]) * (1 << bits)
+    mask = (1 << bits) - 1
 
-        bitvector.set_at(num)
+    for num in table:
+        if num != -1:
+            slot = ((num * FIBONACCI) & MASK64) >> (64 - bits)
+            while grown[slot] != -1:
+                slot = (slot + 1) & mask
+            grown[slot] = num
 
-    return -1
+    return grown
 
-def missing_odds(inputs: list[int]) -> int:
+def missing_odds(inputs: Iterable[int]) -> int:
     """
     @inputs@ is an unordered array of distinct integers.
     If @a@ is the smallest number in the array and @b@ is the biggest,
@@ -92,15 +145,74 @@ def missing_odds(inputs: list[int]) -> int:
     missing_odds([1, 4]) == 3
     missing_odds([4, 1]) == 3
     missing_odds([4, 1, 8, 5]) == 10    # 3 and 7 are missing
+
+    One pass keeps the smallest, the biggest and the sum of the odd
+    numbers present; the answer is the sum of all odds in [a, b], in
+    closed form, minus that sum. @inputs@ may be any iterable. A NumPy
+    array is reduced a chunk at a time instead.
+    Time complexity: O(n)
     """
-    smallest = inputs[0]
-    largest = inputs[0]
+    if np is not None and isinstance(inputs, np.ndarray):
+        return _missing_odds_numpy(inputs)
+
+    smallest = None
+    largest = None
+    present = 0
 
     for num in inputs:
-        if num < smallest:
+        if smallest is None:
+            smallest = largest = num
+        elif num < smallest:
             smallest = num
         elif num > largest:
             largest = num
+        if num & 1:
+            present += num
+
+    if smallest is None:
+        return 0
+
+    return _sum_odds(smallest, largest) - present
+
+
+def _sum_odds(a: int, b: int) -> int:
+    """
+    Return the sum of the odd numbers in [a, b].
+    """
+    first = a | 1
+    last = b if b & 1 else b - 1
+    if first > last:
+        return 0
+    return ((last - first) // 2 + 1) * (first + last) // 2
+
+
+def _missing_odds_numpy(inputs: "np.ndarray") -> int:
+    """
+    missing_odds over a NumPy array of integers, a chunk at a time.
+    """
+    if len(inputs) == 0:
+        return 0
+
+    smallest = int(inputs[0])
+    largest = smallest
+    present = 0
+
+    for start in range(0, len(inputs), CHUNK_SIZE):
+        chunk = np.asarray(inputs[start:start + CHUNK_SIZE], dtype=np.int64)
+        smallest = min(smallest, int(chunk.min()))
+        largest = max(largest, int(chunk.max()))
+        present += _wide_sum(chunk[(chunk & 1) == 1])
+
+    return _sum_odds(smallest, largest) - present
+
+
+def _wide_sum(values: "np.ndarray") -> int:
+    """
+    Return the exact sum of an int64 array of values up to 10^16.
+    The high and low 32 bits are summed apart, so neither int64 sum can
+    overflow for up to 2^31 values.
+    """
+    return (int(np.sum(values >> 32)) << 32) + int(np.sum(values & 0xFFFFFFFF))
 
 
 def k_cool(k: int, n: int) -> int:
@@ -122,18 +234,63 @@ def k_cool(k: int, n: int) -> int:
 
     Examples:
     k_cool(2, 1) == 1                     # The first 2-cool number is 2^0 = 1
-    k_cool(2, 3) == 2                     # The third 2-cool number is 2^1 + 2^0 = 3
+    k_cool(2, 3) == 3                     # The third 2-cool number is 2^1 + 2^0 = 3
     k_cool(3, 5) == 10                    # The fifth 3-cool number is 3^2 + 3^0 = 10
     k_cool(10, 42) == 101010
     k_cool(128, 5000) == 9826529652304384 # The actual result is larger than 10^16 + 61,
                                           # so k_cool returns the remainder of division by 10^16 + 61
+
+    The n-th k-cool number reads the binary digits of n as base-k
+    digits. The bits are evaluated divide and conquer: the top half is
+    scaled by k^(2^j) and added to the bottom half, with the powers
+    k^(2^j) mod 10^16 + 61 memoized per k across calls.
+    Time complexity: O(b log b) for the b bits of n, where a bit-by-bit
+    loop over a big integer would be O(b^2)
+    """
+    leaves, squares = _power_table(k % MODULUS, n.bit_length())
+    return _radix(n, n.bit_length(), leaves, squares)
+
+
+def _power_table(k: int, bits: int) -> tuple[list[int], list[int]]:
+    """
+    Return k^i for i < LEAF_BITS and k^(2^j) while 2^j < @bits@, all
+    mod MODULUS, extending the memoized table of @k@ as needed.
     """
+    if k not in _powers:
+        if len(_powers) >= POWER_CACHE_LIMIT:
+            _powers.clear()
+        leaves = [1] * LEAF_BITS
+        for i in range(1, LEAF_BITS):
+            leaves[i] = leaves[i - 1] * k % MODULUS
+        _powers[k] = (leaves, [k])
+
+    leaves, squares = _powers[k]
+    while 1 << len(squares) < bits:
+        squares.append(squares[-1] * squares[-1] % MODULUS)
 
-    MODULUS = 10**16 + 61
+    return leaves, squares
 
-    # YOUR CODE GOES HERE
-    answer = 0  # please update with the real answer... :-)
-    return answer % MODULUS
+
+def _radix(n: int, bits: int, leaves: list[int], squares: list[int]) -> int:
+    """
+    Return the @bits@ low binary digits of @n@ read in base k, mod MODULUS.
+    """
+    if bits <= LEAF_BITS:
+        total = 0
+        i = 0
+        while n:
+            if n & 1:
+                total += leaves[i]
+            n >>= 1
+            i += 1
+        return total % MODULUS
+
+    # Split at the largest power of two below bits
+    j = (bits - 1).bit_length() - 1
+    half = 1 << j
+    low = _radix(n & ((1 << half) - 1), half, leaves, squares)
+    high = _radix(n >> half, bits - half, leaves, squares)
+    return (low + high * squares[j]) % MODULUS
 
 
 def number_game(numbers: list[int]) -> tuple[str, int]:
@@ -168,10 +325,59 @@ def number_game(numbers: list[int]) -> tuple[str, int]:
     pick 1 to increase his score knowing that Alice will pick 2 and win, or pick 2 himself.
     The same happens on the next move.
     So, nobody picks any numbers to increase their score, which results in a Tie with both players having scores of 0.
+
+    Both players always take the biggest number left: taking it scores
+    if its parity is yours, and otherwise denies it to the opponent, who
+    could only have scored with it. So after sorting in decreasing order,
+    Alice scores the even numbers at even positions and Bob the odd
+    numbers at odd positions.
+    Time complexity: O(n log n)
     """
+    return number_game_many([numbers])[0]
+
 
-    # YOUR CODE GOES HERE
-    pass
+def number_game_many(games: Iterable[list[int]]) -> list[tuple[str, int]]:
+    """
+    Return the result of number_game for each array in @games@.
+    With NumPy, every game is copied into one int64 scratch buffer,
+    grown only when a longer game arrives, and sorted and scored there
+    by vectorised passes; otherwise a single scratch list is reused.
+    """
+    results = []
+
+    if np is not None:
+        scratch = np.empty(0, dtype=np.int64)
+        for numbers in games:
+            n = len(numbers)
+            if n > len(scratch):
+                scratch = np.empty(max(n, 2 * len(scratch)), dtype=np.int64)
+            ordered = scratch[:n]
+            ordered[:] = numbers
+            ordered.sort()
+            decreasing = ordered[::-1]
+            alice = decreasing[0::2]
+            bob = decreasing[1::2]
+            results.append(_winner(_wide_sum(alice[(alice & 1) == 0]),
+                                   _wide_sum(bob[(bob & 1) == 1])))
+        return results
+
+    scratch: list[int] = []
+    for numbers in games:
+        scratch[:] = numbers
+        scratch.sort(reverse=True)
+        alice = sum(num for num in scratch[0::2] if not num & 1)
+        bob = sum(num for num in scratch[1::2] if num & 1)
+        results.append(_winner(alice, bob))
+
+    return results
+
+
+def _winner(alice: int, bob: int) -> tuple[str, int]:
+    if alice > bob:
+        return ("Alice", alice)
+    if bob > alice:
+        return ("Bob", bob)
+    return ("Tie", alice)
 
 
 def road_illumination(road_length: int, poles: list[int]) -> float:
@@ -200,7 +406,153 @@ def road_illumination(road_length: int, poles: list[int]) -> float:
     Examples:
     road_illumination(15, [15, 5, 3, 7, 9, 14, 0]) == 2.5
     road_illumination(5, [2, 5]) == 2.0
+
+    Builds a RoadIndex; keep one around to ask about many road lengths.
+    Time complexity: O(n log n)
+    """
+    return RoadIndex(poles).radius(road_length)
+
+
+class RoadIndex:
+    """
+    The poles of a road, indexed to answer road_illumination for any
+    road length and to take new poles over time.
+
+    The sorted poles are cut into blocks of about POLE_BLOCK. Each block
+    keeps the prefix maxima of the gaps between its own poles, and a max
+    segment tree over the blocks holds each block's largest gap,
+    including the gap back to the previous block. A query descends to
+    the last pole on the road and combines one prefix of the tree with
+    one prefix inside a block.
     """
 
-    # YOUR CODE GOES HERE
-    pass
+    def __init__(self, poles: Iterable[int] = ()) -> None:
+        ordered = sorted(poles)
+        self._blocks: list[list[int]] = [ordered[i:i + POLE_BLOCK]
+                                         for i in range(0, len(ordered), POLE_BLOCK)]
+        self._firsts: list[int] = [block[0] for block in self._blocks]
+        self._gaps: list[list[int]] = [self.__prefix_gaps(block) for block in self._blocks]
+        self._tree: list[int] = []
+        self._leaves: int = 0
+        self.__build()
+
+    def radius(self, road_length: int) -> float:
+        """
+        Return the smallest radius that lights all of [0, @road_length@].
+        Poles beyond the end of the road may still light its end.
+        Returns infinity if there are no poles.
+        Time complexity: O(log n)
+        """
+        if not self._blocks:
+            return float("inf")
+
+        first = self._firsts[0]
+        b = bisect_right(self._firsts, road_length) - 1
+        if b < 0:
+            # Every pole is past the road; the nearest lights it all
+            return float(first)
+
+        block = self._blocks[b]
+        i = bisect_right(block, road_length) - 1
+        gap = max(self.__query(b), self._gaps[b][i])
+        if b > 0:
+            gap = max(gap, block[0] - self._blocks[b - 1][-1])
+
+        # From the last pole on the road to its end, or to the midpoint
+        # with the next pole if that comes first
+        last = block[i]
+        end = road_length - last
+        if i + 1 < len(block):
+            end = min(end, (block[i + 1] - last) / 2)
+        elif b + 1 < len(self._blocks):
+            end = min(end, (self._firsts[b + 1] - last) / 2)
+
+        return float(max(first, gap / 2, end))
+
+    def add_pole(self, x: int) -> None:
+        """
+        Add a pole at position @x@.
+        Time complexity: O(log n) plus an O(POLE_BLOCK) block update
+        """
+        if not self._blocks:
+            self._blocks, self._firsts, self._gaps = [[x]], [x], [[0]]
+            self.__build()
+            return
+
+        b = max(bisect_right(self._firsts, x) - 1, 0)
+        block = self._blocks[b]
+        i = bisect_right(block, x)
+        block.insert(i, x)
+        self._firsts[b] = block[0]
+
+        if len(block) > 2 * POLE_BLOCK:
+            half = len(block) // 2
+            self._blocks[b:b + 1] = [block[:half], block[half:]]
+            self._firsts[b:b + 1] = [block[0], block[half]]
+            self._gaps[b:b + 1] = [self.__prefix_gaps(block[:half]),
+                                   self.__prefix_gaps(block[half:])]
+            self.__build()
+            return
+
+        # Only the prefix maxima from the new pole on can change
+        gaps = self._gaps[b]
+        gaps.append(0)
+        for j in range(max(i, 1), len(block)):
+            gaps[j] = max(gaps[j - 1], block[j] - block[j - 1])
+        self.__update(b)
+        if b + 1 < len(self._blocks):
+            self.__update(b + 1)
+
+    def get_size(self) -> int:
+        """
+        Return the number of poles.
+        Time complexity: O(number of blocks)
+        """
+        return sum(len(block) for block in self._blocks)
+
+    @staticmethod
+    def __prefix_gaps(block: list[int]) -> list[int]:
+        gaps = [0] * len(block)
+        for i in range(1, len(block)):
+            gaps[i] = max(gaps[i - 1], block[i] - block[i - 1])
+        return gaps
+
+    def __block_gap(self, b: int) -> int:
+        gap = self._gaps[b][-1]
+        if b > 0:
+            gap = max(gap, self._firsts[b] - self._blocks[b - 1][-1])
+        return gap
+
+    def __build(self) -> None:
+        self._leaves = max(1, len(self._blocks))
+        self._tree = [0] * (2 * self._leaves)
+        for b in range(len(self._blocks)):
+            self._tree[self._leaves + b] = self.__block_gap(b)
+        for node in range(self._leaves - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __update(self, b: int) -> None:
+        node = self._leaves + b
+        self._tree[node] = self.__block_gap(b)
+        node //= 2
+        while node:
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+
+    def __query(self, b: int) -> int:
+        """
+        Return the largest gap over blocks [0, b).
+        """
+        best = 0
+        lo = self._leaves
+        hi = self._leaves + b
+        while lo < hi:
+            if lo & 1:
+                best = max(best, self._tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = max(best, self._tree[hi])
+            lo //= 2
+            hi //= 2
+        return best